@@ -4,19 +4,22 @@
 import cv2
 import numpy as np
 from typing import Callable, Tuple, Optional
+from ..utils.image_processor import ImageProcessor
 
 
 class ColorAnalyzer:
     """HSV 顏色範圍互動式調整工具"""
     
-    def __init__(self, image_path: str):
+    def __init__(self, image_path: str, decode_scale: int = 1):
         """
         初始化顏色分析器
         
         Args:
             image_path: 圖像檔案路徑
+            decode_scale: JPEG 解碼縮小倍數 (1、2、4 或 8)
         """
-        self.image = cv2.imread(image_path)
+        self.decode_scale = decode_scale
+        self.image = ImageProcessor.load_image(image_path, decode_scale)
         if self.image is None:
             raise FileNotFoundError(f"無法載入圖像: {image_path}")
         
@@ -3,26 +3,68 @@
 """
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Tuple
 from ..utils.image_processor import ImageProcessor
+from .illumination import IlluminationNormalizer
 
 
 class DoughDetector:
     """麵團檢測器類別"""
     
+    # 遮罩清理參數 (3x3 核心，開運算與閉運算各 2 次)
+    MORPH_KERNEL_SIZE = 3
+    OPEN_ITERATIONS = 2
+    CLOSE_ITERATIONS = 2
+    
     def __init__(self, 
                  lower_hsv: Tuple[int, int, int] = (0, 0, 180),
-                 upper_hsv: Tuple[int, int, int] = (100, 75, 255)):
+                 upper_hsv: Tuple[int, int, int] = (100, 75, 255),
+                 normalizer: Optional[IlluminationNormalizer] = None,
+                 num_strips: int = 1):
         """
         初始化檢測器
         
         Args:
             lower_hsv: HSV 下限
             upper_hsv: HSV 上限
+            normalizer: 可選的光照正規化器，在轉換 HSV 前套用
+            num_strips: 將圖像切成幾條水平帶狀區塊以多執行緒處理 (1 表示不切割)
         """
+        if num_strips < 1:
+            raise ValueError("num_strips 必須大於等於 1")
+        
         self.lower_hsv = np.array(lower_hsv)
         self.upper_hsv = np.array(upper_hsv)
+        self.normalizer = normalizer
+        self.num_strips = num_strips
         self.image_processor = ImageProcessor()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 前一幀的麵團遮罩，讓光照模型只以背景更新
+        self._previous_mask: Optional[np.ndarray] = None
+    
+    @property
+    def halo(self) -> int:
+        """
+        帶狀區塊上下需額外重疊的列數
+        
+        每次 3x3 侵蝕或膨脹只會影響相鄰 1 列，開/閉運算各包含 2 * iterations 次，
+        因此重疊 (核心半徑 x 總次數) 列即可得到與整張處理完全相同的結果。
+        """
+        radius = self.MORPH_KERNEL_SIZE // 2
+        return radius * 2 * (self.OPEN_ITERATIONS + self.CLOSE_ITERATIONS)
+    
+    def close(self) -> None:
+        """關閉帶狀區塊處理使用的執行緒池 (之後仍可繼續檢測，會重新建立)"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def __enter__(self) -> 'DoughDetector':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
     
     def detect_dough_pixels(self, image: np.ndarray) -> Dict:
         """
@@ -37,17 +79,31 @@ class DoughDetector:
         if image is None:
             raise ValueError("輸入圖像不能為 None")
         
-        # 轉換為 HSV
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        # 光照正規化
+        if self.normalizer is not None:
+            foreground = self._previous_mask
+            if foreground is not None and foreground.shape != image.shape[:2]:
+                foreground = None
+            image = self.normalizer.normalize(image, foreground=foreground)
         
-        # 創建遮罩
-        mask = cv2.inRange(hsv, self.lower_hsv, self.upper_hsv)
+        if self.num_strips > 1 and image.shape[0] >= 2 * self.num_strips:
+            mask, mask_cleaned, dough_pixels = self._segment_tiled(image)
+        else:
+            # 轉換為 HSV
+            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+            
+            # 創建遮罩
+            mask = cv2.inRange(hsv, self.lower_hsv, self.upper_hsv)
+            
+            # 清理雜訊
+            mask_cleaned = self._clean_mask(mask)
+            
+            # 統計像素
+            dough_pixels = cv2.countNonZero(mask_cleaned)
         
-        # 清理雜訊
-        mask_cleaned = self._clean_mask(mask)
+        if self.normalizer is not None:
+            self._previous_mask = mask_cleaned
         
-        # 統計像素
-        dough_pixels = cv2.countNonZero(mask_cleaned)
         total_pixels = image.shape[0] * image.shape[1]
         dough_percentage = (dough_pixels / total_pixels) * 100
         
@@ -59,32 +115,76 @@ class DoughDetector:
             'original_mask': mask
         }
     
-    def detect_from_file(self, image_path: str) -> Optional[Dict]:
+    def detect_from_file(self, image_path: str,
+                         decode_scale: int = 1) -> Optional[Dict]:
         """
         從檔案檢測麵團
         
         Args:
             image_path: 圖像檔案路徑
+            decode_scale: JPEG 解碼縮小倍數 (1、2、4 或 8)
             
         Returns:
-            檢測結果字典，若載入失敗則返回 None
+            檢測結果字典，若載入失敗則返回 None。
+            像素數為縮小後的數值；'full_res_dough_pixels' 換算回原始解析度。
         """
-        image = cv2.imread(image_path)
+        image = self.image_processor.load_image(image_path, decode_scale)
         if image is None:
             return None
         
-        return self.detect_dough_pixels(image)
+        result = self.detect_dough_pixels(image)
+        result['decode_scale'] = decode_scale
+        result['full_res_dough_pixels'] = result['dough_pixels'] * decode_scale ** 2
+        return result
     
     def _clean_mask(self, mask: np.ndarray) -> np.ndarray:
         """清理遮罩雜訊"""
-        kernel = np.ones((3, 3), np.uint8)
+        kernel = np.ones((self.MORPH_KERNEL_SIZE, self.MORPH_KERNEL_SIZE), np.uint8)
         # 開運算：去除小雜訊
-        mask_cleaned = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=2)
+        mask_cleaned = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel,
+                                        iterations=self.OPEN_ITERATIONS)
         # 閉運算：填補小洞
-        mask_cleaned = cv2.morphologyEx(mask_cleaned, cv2.MORPH_CLOSE, kernel, iterations=2)
+        mask_cleaned = cv2.morphologyEx(mask_cleaned, cv2.MORPH_CLOSE, kernel,
+                                        iterations=self.CLOSE_ITERATIONS)
         return mask_cleaned
     
-    def update_hsv_range(self, lower_hsv: Tuple[int, int, int], upper_hsv: Tuple[int, int, int]):
+    def _segment_tiled(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """將圖像切成重疊的帶狀區塊，以執行緒池平行分割後合併"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.num_strips,
+                                                thread_name_prefix='dough-strip')
+        
+        height = image.shape[0]
+        bounds = np.linspace(0, height, self.num_strips + 1).astype(int)
+        mask = np.empty(image.shape[:2], dtype=np.uint8)
+        mask_cleaned = np.empty(image.shape[:2], dtype=np.uint8)
+        
+        futures = [
+            self._executor.submit(self._segment_strip, image, mask, mask_cleaned,
+                                  y0, y1)
+            for y0, y1 in zip(bounds[:-1], bounds[1:])
+        ]
+        dough_pixels = sum(future.result() for future in futures)
+        return mask, mask_cleaned, dough_pixels
+    
+    def _segment_strip(self, image: np.ndarray, mask: np.ndarray,
+                       mask_cleaned: np.ndarray, y0: int, y1: int) -> int:
+        """處理 [y0, y1) 列 (含上下重疊區)，結果寫回完整遮罩並回傳麵團像素數"""
+        top = max(0, y0 - self.halo)
+        bottom = min(image.shape[0], y1 + self.halo)
+        
+        hsv = cv2.cvtColor(image[top:bottom], cv2.COLOR_BGR2HSV)
+        strip_mask = cv2.inRange(hsv, self.lower_hsv, self.upper_hsv)
+        strip_cleaned = self._clean_mask(strip_mask)
+        
+        # 只保留本區塊的列，捨棄重疊區
+        inner = slice(y0 - top, y1 - top)
+        mask[y0:y1] = strip_mask[inner]
+        mask_cleaned[y0:y1] = strip_cleaned[inner]
+        return cv2.countNonZero(strip_cleaned[inner])
+    
+    def update_hsv_range(self, lower_hsv: Tuple[int, int, int],
+                         upper_hsv: Tuple[int, int, int]):
         """更新 HSV 範圍"""
         self.lower_hsv = np.array(lower_hsv)
         self.upper_hsv = np.array(upper_hsv)
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+光照正規化 - 在閾值處理前抵銷燈光強度變化
+"""
+import cv2
+import numpy as np
+from typing import Optional
+
+
+class IlluminationNormalizer:
+    """以快取的光照模型將每幀亮度拉回參考水準"""
+
+    METHODS = ('ema', 'clahe')
+
+    # 未提供麵團遮罩時，以圖像外圍此比例寬度的邊框作為背景樣本
+    BORDER_FRACTION = 0.1
+
+    def __init__(self,
+                 method: str = 'ema',
+                 alpha: float = 0.05,
+                 scale: float = 0.125,
+                 target_level: Optional[float] = None,
+                 clip_limit: float = 2.0,
+                 tile_grid_size: int = 8):
+        """
+        初始化光照正規化器
+
+        Args:
+            method: 'ema' 以亮度的指數移動平均補償整體光照；
+                    'clahe' 在縮小後的亮度圖上做 CLAHE 並套用其增益
+            alpha: EMA 更新權重 (越小越平滑)
+            scale: 建立光照模型時的縮小比例
+            target_level: 目標亮度；None 表示使用第一幀 (或平場圖) 的亮度
+            clip_limit: CLAHE 的對比限制
+            tile_grid_size: CLAHE 的網格數
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"不支援的正規化方法: {method}")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha 必須介於 0 與 1 之間")
+
+        self.method = method
+        self.alpha = alpha
+        self.scale = scale
+        self.target_level = target_level
+        self._initial_target_level = target_level
+        self.level: Optional[float] = None
+        self.clahe = cv2.createCLAHE(clipLimit=clip_limit,
+                                     tileGridSize=(tile_grid_size, tile_grid_size))
+
+        # 平場增益 (縮小尺寸) 與放大到全尺寸後的快取
+        self._flat_gain: Optional[np.ndarray] = None
+        self._flat_gain_full: Optional[np.ndarray] = None
+
+    def _luminance(self, image: np.ndarray) -> np.ndarray:
+        """縮小圖像並取 HSV 的 V 通道 (BGR 三通道的最大值)"""
+        small = cv2.resize(image, None, fx=self.scale, fy=self.scale,
+                           interpolation=cv2.INTER_AREA)
+        return small.max(axis=2).astype(np.float32)
+
+    def _background(self, lum: np.ndarray,
+                    foreground: Optional[np.ndarray]) -> np.ndarray:
+        """
+        取得縮小亮度圖中的背景像素
+
+        光照水準只由背景估計，麵團長大 (佔據畫面的比例增加) 不會被誤判為燈光變化。
+
+        Args:
+            lum: 縮小後的亮度圖
+            foreground: 麵團遮罩 (全尺寸，非零為麵團)；None 表示改用圖像外圍邊框
+
+        Returns:
+            背景像素的一維陣列 (可能為空)
+        """
+        height, width = lum.shape
+        if foreground is None:
+            by = max(1, int(height * self.BORDER_FRACTION))
+            bx = max(1, int(width * self.BORDER_FRACTION))
+            border = np.ones((height, width), dtype=bool)
+            border[by:height - by, bx:width - bx] = False
+            return lum[border]
+
+        # 縮小後只要部分涵蓋麵團就排除，並向外擴張一格以涵蓋兩幀間的成長
+        small = cv2.resize(foreground, (width, height), interpolation=cv2.INTER_AREA)
+        excluded = cv2.dilate((small > 0).astype(np.uint8), np.ones((3, 3), np.uint8))
+        return lum[excluded == 0]
+
+    def set_flat_field(self, image: np.ndarray) -> None:
+        """
+        以啟動時拍攝的平場圖 (空箱或白卡) 建立空間增益，校正暗角與光照不均
+
+        Args:
+            image: 平場圖像 (BGR 格式)
+        """
+        flat = cv2.GaussianBlur(self._luminance(image), (0, 0), 2)
+        flat = np.maximum(flat, 1.0)
+        self._flat_gain = (flat.mean() / flat).astype(np.float32)
+        self._flat_gain_full = None
+        if self.target_level is None:
+            self.target_level = float(flat.mean())
+        self.level = float(flat.mean())
+
+    def update(self, image: np.ndarray,
+               foreground: Optional[np.ndarray] = None) -> Optional[float]:
+        """
+        以新的一幀的背景亮度增量更新光照模型
+
+        Args:
+            image: 輸入圖像 (BGR 格式)
+            foreground: 麵團遮罩 (例如前一幀的檢測結果)，其範圍不計入光照水準；
+                        None 表示以圖像外圍邊框作為背景
+
+        Returns:
+            更新後的光照水準；畫面中沒有背景可用時維持原水準
+        """
+        lum = self._luminance(image)
+        if self._flat_gain is not None and self._flat_gain.shape == lum.shape:
+            lum *= self._flat_gain
+        background = self._background(lum, foreground)
+        if background.size == 0:
+            return self.level
+        current = float(np.median(background))
+
+        if self.level is None:
+            self.level = current
+        else:
+            self.level += self.alpha * (current - self.level)
+        if self.target_level is None:
+            self.target_level = self.level
+        return self.level
+
+    def normalize(self, image: np.ndarray, update: bool = True,
+                  foreground: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        正規化圖像亮度
+
+        Args:
+            image: 輸入圖像 (BGR 格式)
+            update: 是否先以本幀更新光照模型
+            foreground: 更新光照模型時要排除的麵團遮罩，見 update()
+
+        Returns:
+            正規化後的圖像 (BGR, uint8)
+        """
+        if image is None:
+            raise ValueError("輸入圖像不能為 None")
+
+        if self.method == 'clahe':
+            return self._normalize_clahe(image)
+
+        if update or self.level is None:
+            self.update(image, foreground)
+        if self.level is None:
+            return image.copy()
+        gain = self.target_level / max(self.level, 1.0)
+
+        flat_gain = self._full_flat_gain(image.shape)
+        if flat_gain is None:
+            return cv2.convertScaleAbs(image, alpha=gain)
+        return cv2.multiply(image, flat_gain, scale=gain, dtype=cv2.CV_8U)
+
+    def _full_flat_gain(self, shape) -> Optional[np.ndarray]:
+        """取得全尺寸的平場增益，只在尺寸改變時重新放大"""
+        if self._flat_gain is None:
+            return None
+        height, width = shape[:2]
+        cached = self._flat_gain_full
+        if cached is None or cached.shape[:2] != (height, width):
+            full = cv2.resize(self._flat_gain, (width, height),
+                              interpolation=cv2.INTER_LINEAR)
+            self._flat_gain_full = cv2.merge([full] * shape[2])
+        return self._flat_gain_full
+
+    def _normalize_clahe(self, image: np.ndarray) -> np.ndarray:
+        """在縮小的亮度圖上做 CLAHE，將增益放大後套用到原圖"""
+        lum = self._luminance(image)
+        equalized = self.clahe.apply(lum.astype(np.uint8)).astype(np.float32)
+        gain = equalized / np.maximum(lum, 1.0)
+        full = cv2.resize(gain, (image.shape[1], image.shape[0]),
+                          interpolation=cv2.INTER_LINEAR)
+        return cv2.multiply(image, cv2.merge([full] * image.shape[2]), dtype=cv2.CV_8U)
+
+    def reset(self) -> None:
+        """清除光照模型 (保留平場增益)"""
+        self.level = None
+        self.target_level = self._initial_target_level
@@ -0,0 +1,332 @@
+"""
+影像來源 - 攝影機、合成麵團影像與檔案重播，以及吞吐量負載測試
+"""
+import abc
+import math
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class CaptureSource(abc.ABC):
+    """影像來源介面，read() 的回傳格式與 cv2.VideoCapture 相同"""
+
+    def __init__(self):
+        self.last_timestamp: Optional[float] = None
+        self.dropped_frames = 0
+
+    @abc.abstractmethod
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        讀取下一幀
+
+        Returns:
+            (是否成功, BGR 圖像)；成功時 last_timestamp 為該幀的擷取時間
+        """
+
+    def release(self) -> None:
+        """釋放資源"""
+
+    def __enter__(self) -> 'CaptureSource':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class _FrameClock:
+    """依固定 FPS 計算幀索引；消費端跟不上時跳過的幀計為丟棄"""
+
+    def __init__(self, fps: float, realtime: bool,
+                 clock: Callable[[], float], sleep: Callable[[float], None]):
+        self.fps = fps
+        self.realtime = realtime
+        self.clock = clock
+        self.sleep = sleep
+        self.start: Optional[float] = None
+        self.index = -1
+
+    def next(self) -> Tuple[int, float, int]:
+        """
+        取得下一幀的索引
+
+        Returns:
+            (幀索引, 擷取時間, 本次跳過的幀數)
+        """
+        now = self.clock()
+        if not self.realtime:
+            self.index += 1
+            return self.index, now, 0
+
+        if self.start is None:
+            self.start = now
+        due = int((now - self.start) * self.fps)
+        if due <= self.index:
+            # 比下一幀的時間早，等待至該幀產生
+            due = self.index + 1
+            self.sleep(self.start + due / self.fps - now)
+            now = self.clock()
+        skipped = due - self.index - 1
+        self.index = due
+        return due, now, skipped
+
+
+class CameraSource(CaptureSource):
+    """實體攝影機來源"""
+
+    def __init__(self, camera_index: int = 0, width: int = 1280, height: int = 720):
+        """
+        開啟攝影機
+
+        Args:
+            camera_index: 攝影機索引
+            width: 擷取寬度
+            height: 擷取高度
+        """
+        super().__init__()
+        self.cap = cv2.VideoCapture(camera_index)
+        if not self.cap.isOpened():
+            self.cap.release()
+            raise IOError(f"無法開啟攝影機 {camera_index}")
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ret, frame = self.cap.read()
+        self.last_timestamp = time.monotonic()
+        return ret, frame
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class SyntheticDoughSource(CaptureSource):
+    """合成的麵團發酵影像序列：逐漸膨脹的麵團、感光雜訊與燈光漂移"""
+
+    def __init__(self,
+                 width: int = 1280,
+                 height: int = 720,
+                 fps: float = 15.0,
+                 containers: int = 1,
+                 growth_per_frame: float = 0.002,
+                 noise_sigma: float = 6.0,
+                 noise_patterns: int = 4,
+                 lighting_drift: float = 0.1,
+                 drift_period_frames: int = 300,
+                 max_frames: Optional[int] = None,
+                 realtime: bool = True,
+                 seed: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        初始化合成影像來源
+
+        Args:
+            width: 影像寬度
+            height: 影像高度
+            fps: 影像產生速率
+            containers: 容器 (麵團) 數量，水平排列
+            growth_per_frame: 每幀麵團半徑的相對成長量
+            noise_sigma: 亮度雜訊 (三個通道共用) 的高斯標準差
+            noise_patterns: 預先產生並輪流使用的雜訊圖樣數量
+            lighting_drift: 燈光亮度的正弦漂移幅度 (0.1 表示 ±10%)
+            drift_period_frames: 燈光漂移的週期 (幀)
+            max_frames: 產生的幀數上限，None 表示無限
+            realtime: True 依 fps 節奏產生 (跟不上時丟幀)，False 盡可能快地產生
+            seed: 亂數種子
+            clock: 時鐘函數 (測試用)
+            sleep: 等待函數 (測試用)
+        """
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.growth_per_frame = growth_per_frame
+        self.lighting_drift = lighting_drift
+        self.drift_period_frames = drift_period_frames
+        self.max_frames = max_frames
+        self._clock = _FrameClock(fps, realtime, clock, sleep)
+
+        if noise_sigma > 0 and noise_patterns < 1:
+            raise ValueError("noise_patterns 必須大於等於 1")
+
+        rng = np.random.default_rng(seed)
+        spacing = width / containers
+        self.centers = np.column_stack([
+            (np.arange(containers) + 0.5) * spacing,
+            np.full(containers, height * 0.55),
+        ])
+        self.base_radius = (min(spacing, height) * 0.18
+                            * rng.uniform(0.9, 1.1, containers))
+        self.max_radius = min(spacing, height) * 0.45
+
+        # 預先產生少量亮度雜訊圖樣 (單一平面，拆成正、負兩部分以使用飽和加減)，
+        # 避免每幀重新取樣。雜訊若各通道獨立，會打亂近白色麵團的色相而無法被檢測；
+        # 逐張以 float32 產生，不一次配置整組浮點陣列
+        count = noise_patterns if noise_sigma > 0 else 0
+        self._noise_pos = np.empty((count, height, width), dtype=np.uint8)
+        self._noise_neg = np.empty((count, height, width), dtype=np.uint8)
+        for k in range(count):
+            noise = rng.standard_normal((height, width), dtype=np.float32)
+            noise *= noise_sigma
+            self._noise_pos[k] = np.clip(noise, 0, 255)
+            self._noise_neg[k] = np.clip(-noise, 0, 255)
+        self._background = (60, 55, 50)
+        self._dough = (225, 230, 235)
+
+    def render(self, index: int) -> np.ndarray:
+        """產生第 index 幀"""
+        growth = 1 + self.growth_per_frame * index
+        radius = np.minimum(self.base_radius * growth, self.max_radius)
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        frame[:] = self._background
+        for (cx, cy), r in zip(self.centers, radius):
+            cv2.ellipse(frame, (int(cx), int(cy)), (int(r), int(r / 1.4)),
+                        0, 0, 360, self._dough, -1)
+
+        phase = 2 * math.pi * index / self.drift_period_frames
+        light = 1 + self.lighting_drift * math.sin(phase)
+        frame = cv2.convertScaleAbs(frame, alpha=light)
+        if len(self._noise_pos):
+            k = index % len(self._noise_pos)
+            cv2.add(frame, cv2.cvtColor(self._noise_pos[k], cv2.COLOR_GRAY2BGR),
+                    dst=frame)
+            cv2.subtract(frame, cv2.cvtColor(self._noise_neg[k], cv2.COLOR_GRAY2BGR),
+                         dst=frame)
+        return frame
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        index, timestamp, skipped = self._clock.next()
+        if self.max_frames is not None and index >= self.max_frames:
+            return False, None
+        self.dropped_frames += skipped
+        self.last_timestamp = timestamp
+        return True, self.render(index)
+
+
+class ReplaySource(CaptureSource):
+    """重播影像目錄或影片檔"""
+
+    def __init__(self,
+                 path: str,
+                 fps: float = 15.0,
+                 realtime: bool = True,
+                 loop: bool = False,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        初始化重播來源
+
+        Args:
+            path: 影像目錄 (依檔名排序) 或影片檔路徑
+            fps: 重播速率；影片檔會優先使用檔案本身的 FPS
+            realtime: True 依 fps 節奏重播 (跟不上時丟幀)，False 盡可能快地重播
+            loop: 播放結束後是否從頭開始
+            clock: 時鐘函數 (測試用)
+            sleep: 等待函數 (測試用)
+        """
+        super().__init__()
+        self.loop = loop
+        self.files: List[str] = []
+        self.cap = None
+
+        if os.path.isdir(path):
+            self.files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(IMAGE_EXTENSIONS))
+            if not self.files:
+                raise FileNotFoundError(f"目錄中沒有影像檔: {path}")
+        else:
+            self.cap = cv2.VideoCapture(path)
+            if not self.cap.isOpened():
+                self.cap.release()
+                raise FileNotFoundError(f"無法開啟影片: {path}")
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or fps
+
+        self._clock = _FrameClock(fps, realtime, clock, sleep)
+        self._video_index = -1
+
+    def _read_file(self, index: int) -> Optional[np.ndarray]:
+        if index >= len(self.files):
+            if not self.loop:
+                return None
+            index %= len(self.files)
+        return cv2.imread(self.files[index])
+
+    def _rewind(self) -> bool:
+        """循環播放時回到影片開頭"""
+        return self.loop and self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _read_video(self, index: int) -> Optional[np.ndarray]:
+        # 影片只能循序解碼，跳過的幀以 grab() 略過而不解碼
+        for _ in range(index - self._video_index - 1):
+            if not self.cap.grab() and not (self._rewind() and self.cap.grab()):
+                return None
+        self._video_index = index
+        ok, frame = self.cap.read()
+        if not ok and self._rewind():
+            ok, frame = self.cap.read()
+        return frame if ok else None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        index, timestamp, skipped = self._clock.next()
+        frame = self._read_file(index) if self.files else self._read_video(index)
+        if frame is None:
+            return False, None
+        self.dropped_frames += skipped
+        self.last_timestamp = timestamp
+        return True, frame
+
+    def release(self) -> None:
+        if self.cap is not None:
+            self.cap.release()
+
+
+def run_load_test(source: CaptureSource,
+                  process: Callable[[np.ndarray], object],
+                  max_frames: Optional[int] = None,
+                  duration: Optional[float] = None,
+                  clock: Callable[[], float] = time.monotonic) -> Dict:
+    """
+    量測擷取與分析迴圈的端到端吞吐量
+
+    Args:
+        source: 影像來源
+        process: 每幀的分析函數，例如 DoughDetector().detect_dough_pixels
+        max_frames: 最多處理的幀數
+        duration: 最長執行秒數
+        clock: 時鐘函數，需與影像來源使用相同的時間基準
+
+    Returns:
+        包含處理幀數、FPS、延遲統計 (秒) 與丟幀數的字典
+    """
+    latencies: List[float] = []
+    start = clock()
+    while max_frames is None or len(latencies) < max_frames:
+        if duration is not None and clock() - start >= duration:
+            break
+        ok, frame = source.read()
+        if not ok:
+            break
+        process(frame)
+        latencies.append(clock() - source.last_timestamp)
+    elapsed = clock() - start
+
+    return _summarize(latencies, elapsed, source.dropped_frames)
+
+
+def _summarize(latencies: Sequence[float], elapsed: float, dropped: int) -> Dict:
+    lat = np.asarray(latencies, dtype=np.float64)
+    return {
+        'frames': len(lat),
+        'elapsed': elapsed,
+        'fps': len(lat) / elapsed if elapsed > 0 else 0.0,
+        'latency_mean': float(lat.mean()) if len(lat) else 0.0,
+        'latency_p95': float(np.percentile(lat, 95)) if len(lat) else 0.0,
+        'latency_max': float(lat.max()) if len(lat) else 0.0,
+        'dropped_frames': dropped,
+    }
@@ -0,0 +1,317 @@
+"""
+本機即時監控儀表板 - MJPEG 串流、JSON 指標與 WebSocket 推播
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+from typing import Dict, Optional, Set
+
+import cv2
+import numpy as np
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MJPEG_BOUNDARY = "frame"
+
+INDEX_HTML = b"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Dough Monitor</title></head>
+<body>
+<img src="/stream.mjpg">
+<pre id="metrics"></pre>
+<script>
+var ws = new WebSocket("ws://" + location.host + "/ws");
+ws.onmessage = function (e) {
+  document.getElementById("metrics").textContent =
+    JSON.stringify(JSON.parse(e.data), null, 2);
+};
+</script>
+</body></html>
+"""
+
+
+class _Frame:
+    """已編碼的一幀，所有連線共用同一份位元組"""
+
+    __slots__ = ('seq', 'jpeg', 'mjpeg_part', 'metrics_json', 'ws_message')
+
+    def __init__(self, seq: int, jpeg: bytes, metrics: Dict):
+        self.seq = seq
+        self.jpeg = jpeg
+        self.mjpeg_part = (
+            f"--{MJPEG_BOUNDARY}\r\n"
+            f"Content-Type: image/jpeg\r\n"
+            f"Content-Length: {len(jpeg)}\r\n\r\n"
+        ).encode() + jpeg + b"\r\n"
+        self.metrics_json = json.dumps(metrics, default=_json_default).encode()
+        self.ws_message = _encode_ws_frame(self.metrics_json)
+
+
+def _json_default(value):
+    """將 NumPy 型別轉為可序列化的 Python 型別"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"無法序列化的型別: {type(value).__name__}")
+
+
+def _encode_ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """編碼伺服器端 WebSocket 訊框 (不加遮罩)"""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack('!H', length)
+    else:
+        header += bytes([127]) + struct.pack('!Q', length)
+    return header + payload
+
+
+class DashboardServer:
+    """本機 HTTP/WebSocket 儀表板伺服器"""
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 8080,
+                 jpeg_quality: int = 80,
+                 client_queue_size: int = 2):
+        """
+        初始化儀表板伺服器
+
+        Args:
+            host: 綁定位址 (預設只接受本機連線)
+            port: 連接埠，0 表示由系統自動分配
+            jpeg_quality: MJPEG 串流的 JPEG 品質
+            client_queue_size: 每個連線最多暫存的幀數，超過時丟棄最舊的幀
+        """
+        self.host = host
+        self.port = port
+        self.jpeg_quality = jpeg_quality
+        self.client_queue_size = client_queue_size
+
+        self.latest: Optional[_Frame] = None
+        self.dropped_frames = 0
+        self._seq = 0
+        self._clients: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+
+    def start(self) -> int:
+        """
+        在背景執行緒中啟動伺服器
+
+        Returns:
+            實際綁定的連接埠
+
+        Raises:
+            OSError: 無法綁定位址 (例如連接埠已被使用)
+        """
+        if self._thread is not None:
+            return self.port
+
+        self._start_error = None
+        self._thread = threading.Thread(target=self._run, name='dough-dashboard',
+                                        daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            self._thread.join()
+            self._thread = None
+            self._started.clear()
+            raise self._start_error
+        return self.port
+
+    def stop(self) -> None:
+        """停止伺服器並等待背景執行緒結束"""
+        if self._loop is None or self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._loop = None
+
+    def publish(self, image: np.ndarray, metrics: Dict) -> None:
+        """
+        發布最新一幀與指標 (可從擷取迴圈的執行緒呼叫，不會阻塞)
+
+        Args:
+            image: 標註後的圖像 (BGR)
+            metrics: 目前的量測結果
+        """
+        ok, encoded = cv2.imencode('.jpg', image,
+                                   [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError("無法將圖像編碼為 JPEG")
+
+        self._seq += 1
+        frame = _Frame(self._seq, encoded.tobytes(), metrics)
+        self.latest = frame
+
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._fan_out, frame)
+
+    @property
+    def client_count(self) -> int:
+        """目前連線中的串流/WebSocket 用戶數"""
+        return len(self._clients)
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port))
+        except BaseException as e:
+            # 交由 start() 在呼叫端執行緒重新拋出，避免其永遠等待
+            self._start_error = e
+            loop.close()
+            self._started.set()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._loop = loop
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+            self._started.clear()
+
+    def _fan_out(self, frame: _Frame) -> None:
+        """將新幀放入每個連線的佇列；佇列已滿時丟棄最舊的幀"""
+        for queue in self._clients:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped_frames += 1
+            queue.put_nowait(frame)
+
+    def _subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.client_queue_size)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self._clients.add(queue)
+        return queue
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            lines = request.decode('latin-1').split("\r\n")
+            method, path, _ = lines[0].split(' ', 2)
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            if method != 'GET':
+                await self._send_response(writer, 405, 'text/plain',
+                                          b'Method Not Allowed')
+            elif path == '/':
+                await self._send_response(writer, 200, 'text/html; charset=utf-8',
+                                          INDEX_HTML)
+            elif path == '/metrics':
+                body = self.latest.metrics_json if self.latest else b'{}'
+                await self._send_response(writer, 200, 'application/json', body)
+            elif path == '/snapshot.jpg' and self.latest is not None:
+                await self._send_response(writer, 200, 'image/jpeg', self.latest.jpeg)
+            elif path == '/stream.mjpg':
+                await self._stream_mjpeg(writer)
+            elif path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                await self._stream_websocket(reader, writer, headers)
+            else:
+                await self._send_response(writer, 404, 'text/plain', b'Not Found')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send_response(writer: asyncio.StreamWriter, status: int,
+                             content_type: str, body: bytes) -> None:
+        reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Cache-Control: no-cache\r\n"
+            f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def _stream_mjpeg(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Connection: close\r\n\r\n".encode())
+        queue = self._subscribe()
+        try:
+            while True:
+                frame = await queue.get()
+                writer.write(frame.mjpeg_part)
+                # 慢速用戶只會卡住自己的協程，擷取迴圈不受影響
+                await writer.drain()
+        finally:
+            self._clients.discard(queue)
+
+    async def _stream_websocket(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter,
+                                headers: Dict[str, str]) -> None:
+        key = headers.get('sec-websocket-key')
+        if not key:
+            raise ValueError("缺少 Sec-WebSocket-Key")
+        accept = base64.b64encode(
+            hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode())
+        await writer.drain()
+
+        queue = self._subscribe()
+        sender = asyncio.ensure_future(self._send_ws_frames(queue, writer))
+        try:
+            await self._read_until_ws_close(reader)
+        finally:
+            sender.cancel()
+            self._clients.discard(queue)
+            writer.write(_encode_ws_frame(b'', opcode=0x8))
+
+    @staticmethod
+    async def _send_ws_frames(queue: asyncio.Queue,
+                              writer: asyncio.StreamWriter) -> None:
+        while True:
+            frame = await queue.get()
+            writer.write(frame.ws_message)
+            await writer.drain()
+
+    @staticmethod
+    async def _read_until_ws_close(reader: asyncio.StreamReader) -> None:
+        """讀取並丟棄用戶端訊框，直到收到關閉訊框或連線中斷"""
+        while True:
+            head = await reader.readexactly(2)
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', await reader.readexactly(8))[0]
+            if head[1] & 0x80:
+                await reader.readexactly(4)
+            await reader.readexactly(length)
+            if opcode == 0x8:
+                return
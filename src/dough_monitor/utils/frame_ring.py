@@ -0,0 +1,221 @@
+"""
+共享記憶體影像環形緩衝區 - 擷取行程與分析行程之間零複製傳遞影像
+"""
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 標頭: [最新序號, 各槽位序號...]；序號由 1 開始，0 表示空槽，負值表示寫入中
+_HEADER_DTYPE = np.int64
+
+
+class FrameRing:
+    """固定槽位數的共享記憶體影像環形緩衝區 (單一寫入者，多個讀取者)"""
+
+    def __init__(self,
+                 shape: Tuple[int, ...] = (720, 1280, 3),
+                 dtype=np.uint8,
+                 slots: int = 4,
+                 name: Optional[str] = None,
+                 create: bool = True):
+        """
+        建立或連接環形緩衝區
+
+        Args:
+            shape: 每幀影像的形狀
+            dtype: 影像資料型別
+            slots: 槽位數量；讀取者落後超過此數量時，最舊的幀會被覆寫
+            name: 共享記憶體名稱；建立時為 None 則自動產生
+            create: True 表示建立新的緩衝區，False 表示連接既有的緩衝區
+        """
+        if slots < 2:
+            raise ValueError("槽位數量至少為 2")
+
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        header_bytes = (slots + 1) * np.dtype(_HEADER_DTYPE).itemsize
+        size = header_bytes + slots * self.frame_bytes
+
+        self._owner = create
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = self._attach_untracked(name)
+
+        self._header = np.ndarray((slots + 1,), dtype=_HEADER_DTYPE,
+                                  buffer=self._shm.buf)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype,
+                                  buffer=self._shm.buf, offset=header_bytes)
+        if create:
+            self._header[:] = 0
+
+    @classmethod
+    def attach(cls, name: str, shape: Tuple[int, ...], dtype=np.uint8,
+               slots: int = 4) -> 'FrameRing':
+        """連接由其他行程建立的環形緩衝區"""
+        return cls(shape, dtype, slots, name=name, create=False)
+
+    @staticmethod
+    def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+        """
+        連接既有的共享記憶體，但不交給 resource_tracker 管理
+
+        連接者不擁有這塊記憶體，若被登記，行程結束時會被 resource_tracker 刪除。
+        """
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            # resource_tracker 以帶 "/" 前綴的名稱登記
+            resource_tracker.unregister('/' + shm.name, 'shared_memory')
+        return shm
+
+    @property
+    def name(self) -> str:
+        """共享記憶體名稱，傳給其他行程用於 attach"""
+        return self._shm.name
+
+    @property
+    def latest_seq(self) -> int:
+        """最近一次提交的序號 (尚未寫入任何幀時為 0)"""
+        return int(self._header[0])
+
+    def begin_write(self) -> Tuple[int, np.ndarray]:
+        """
+        取得下一個槽位供寫入者直接寫入 (例如 cap.read(image=view))
+
+        Returns:
+            (序號, 槽位的 NumPy 視圖)；寫完後需呼叫 commit(序號)
+        """
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        # 先標記為寫入中，讀取者看到負值會視為不可用
+        self._header[1 + slot] = -seq
+        return seq, self._frames[slot]
+
+    def commit(self, seq: int) -> None:
+        """提交已寫入的槽位，使讀取者可見"""
+        self._header[1 + seq % self.slots] = seq
+        self._header[0] = seq
+
+    def write(self, frame: np.ndarray) -> int:
+        """
+        將一幀複製進下一個槽位並提交
+
+        Returns:
+            該幀的序號
+        """
+        seq, view = self.begin_write()
+        view[...] = frame
+        self.commit(seq)
+        return seq
+
+    def read(self, seq: int) -> Optional[np.ndarray]:
+        """
+        取得指定序號的幀 (零複製視圖)
+
+        視圖在寫入者繞回同一槽位後會被覆寫；處理完畢後以 is_valid(seq) 確認內容未被覆寫。
+
+        Returns:
+            NumPy 視圖；該幀已被覆寫或尚未提交時返回 None
+        """
+        if seq <= 0 or not self.is_valid(seq):
+            return None
+        return self._frames[seq % self.slots]
+
+    def is_valid(self, seq: int) -> bool:
+        """檢查指定序號的幀是否仍完整存在於槽位中"""
+        return int(self._header[1 + seq % self.slots]) == seq
+
+    def close(self) -> None:
+        """
+        中斷與共享記憶體的連接
+
+        呼叫前需釋放所有由 read/begin_write 取得的視圖。
+        """
+        self._header = None
+        self._frames = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """刪除共享記憶體 (僅建立者應呼叫)"""
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> 'FrameRing':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        self.unlink()
+
+
+class FrameReader:
+    """環形緩衝區的讀取游標，可讓多個分析 worker 依序號分工"""
+
+    def __init__(self, ring: FrameRing, worker_index: int = 0, num_workers: int = 1):
+        """
+        初始化讀取游標
+
+        Args:
+            ring: 環形緩衝區
+            worker_index: 本 worker 的索引
+            num_workers: worker 總數；每個 worker 只處理 seq % num_workers == worker_index 的幀
+        """
+        if not 0 <= worker_index < num_workers:
+            raise ValueError("worker_index 必須介於 0 與 num_workers 之間")
+
+        self.ring = ring
+        self.worker_index = worker_index
+        self.num_workers = num_workers
+        self.last_seq = 0
+        self.dropped = 0
+
+    def _next_candidate(self, latest: int) -> int:
+        """計算下一個屬於本 worker 的序號，落後太多時跳到最舊仍可用的幀"""
+        seq = self.last_seq + 1
+        oldest = latest - self.ring.slots + 2  # 保留一個槽位給正在寫入的幀
+        if seq < oldest:
+            seq = oldest
+        offset = (self.worker_index - seq) % self.num_workers
+        return seq + offset
+
+    def _count_owned(self, start: int, stop: int) -> int:
+        """計算 [start, stop) 之間屬於本 worker 的序號數量"""
+        n, w = self.num_workers, self.worker_index
+        return max(0, (stop - 1 - w) // n - (start - 1 - w) // n)
+
+    def next(self, timeout: Optional[float] = None,
+             poll_interval: float = 0.001) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        取得下一幀 (零複製視圖)
+
+        Args:
+            timeout: 最長等待秒數；None 表示一直等待，0 表示不等待
+            poll_interval: 輪詢間隔秒數
+
+        Returns:
+            (序號, 視圖)；逾時返回 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            latest = self.ring.latest_seq
+            seq = self._next_candidate(latest)
+            if seq <= latest:
+                frame = self.ring.read(seq)
+                self.dropped += self._count_owned(self.last_seq + 1, seq)
+                self.last_seq = seq
+                if frame is not None:
+                    return seq, frame
+                # 讀取前已被覆寫，視為丟棄並繼續
+                self.dropped += 1
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
@@ -1,10 +1,22 @@
 """
 圖像處理工具
 """
+import os
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
+
+# 每組分析結果: (原始圖像, HSV 圖像, 原始遮罩, 清理後遮罩)
+AnalysisPanels = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+MONTAGE_TITLES = ('Original Image', 'HSV Image', 'Initial Mask', 'Cleaned Mask')
+
+# JPEG 解碼時直接縮小 (DCT 域縮放) 的讀取旗標
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
 
 
 class ImageProcessor:
@@ -17,7 +29,7 @@ class ImageProcessor:
                                cleaned_mask: np.ndarray,
                                show_plot: bool = True) -> None:
         """
-        顯示分析結果
+        顯示分析結果 (matplotlib，較慢；批次檢視請使用 render_contact_sheet)
         
         Args:
             image: 原始圖像 (BGR)
@@ -29,6 +41,8 @@ class ImageProcessor:
         if not show_plot:
             return
         
+        import matplotlib.pyplot as plt
+        
         # 轉換為 RGB 顯示
         img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         hsv_rgb = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
@@ -58,6 +72,101 @@ class ImageProcessor:
         plt.tight_layout()
         plt.show()
     
+    @staticmethod
+    def render_contact_sheet(panels: Sequence[AnalysisPanels],
+                             tile_size: Tuple[int, int] = (320, 240),
+                             out: Optional[np.ndarray] = None,
+                             draw_titles: bool = True) -> np.ndarray:
+        """
+        將多組分析結果拼接成一張總覽圖 (每組一列，依序為原始、HSV、初始遮罩、清理後遮罩)
+        
+        Args:
+            panels: 分析結果序列，每組為 (image, hsv, original_mask, cleaned_mask)
+            tile_size: 每格的 (寬, 高)
+            out: 可重複使用的預先配置畫布，形狀需為 (列數 * 高, 4 * 寬, 3)
+            draw_titles: 是否在每格左上角標示名稱
+            
+        Returns:
+            BGR 畫布；若傳入 out 則直接寫入並回傳 out
+        """
+        tile_w, tile_h = tile_size
+        shape = (len(panels) * tile_h, len(MONTAGE_TITLES) * tile_w, 3)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape[0] < shape[0] or out.shape[1:] != shape[1:]:
+            raise ValueError(f"畫布尺寸不足: 需要 {shape}，實際為 {out.shape}")
+        
+        for row, images in enumerate(panels):
+            y = row * tile_h
+            for col, (src, title) in enumerate(zip(images, MONTAGE_TITLES)):
+                x = col * tile_w
+                tile = out[y:y + tile_h, x:x + tile_w]
+                if src.ndim == 2:
+                    # 遮罩以最近鄰縮放，並廣播到三個通道
+                    resized = cv2.resize(src, tile_size,
+                                         interpolation=cv2.INTER_NEAREST)
+                    tile[...] = resized[..., None]
+                else:
+                    # HSV 直接以偽彩色顯示，不轉回 RGB
+                    tile[...] = cv2.resize(src, tile_size, interpolation=cv2.INTER_AREA)
+                if draw_titles:
+                    cv2.putText(tile, title, (5, 18), cv2.FONT_HERSHEY_SIMPLEX,
+                                0.5, (0, 0, 255), 1, cv2.LINE_AA)
+        
+        return out[:shape[0]]
+    
+    @staticmethod
+    def save_contact_sheets(panels: Sequence[AnalysisPanels],
+                            output_dir: str,
+                            tile_size: Tuple[int, int] = (320, 240),
+                            rows_per_sheet: int = 8,
+                            prefix: str = 'contact_sheet') -> List[str]:
+        """
+        將大量分析結果分批寫成總覽圖檔，所有批次共用同一張畫布
+        
+        Args:
+            panels: 分析結果序列，每組為 (image, hsv, original_mask, cleaned_mask)
+            output_dir: 輸出目錄
+            tile_size: 每格的 (寬, 高)
+            rows_per_sheet: 每張總覽圖的列數
+            prefix: 輸出檔名前綴
+            
+        Returns:
+            已寫入的檔案路徑清單
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        tile_w, tile_h = tile_size
+        canvas = np.empty((rows_per_sheet * tile_h, len(MONTAGE_TITLES) * tile_w, 3),
+                          dtype=np.uint8)
+        
+        paths = []
+        for index, start in enumerate(range(0, len(panels), rows_per_sheet)):
+            sheet = ImageProcessor.render_contact_sheet(
+                panels[start:start + rows_per_sheet], tile_size, out=canvas)
+            path = os.path.join(output_dir, f"{prefix}_{index:03d}.jpg")
+            if not cv2.imwrite(path, sheet):
+                raise IOError(f"無法寫入圖像: {path}")
+            paths.append(path)
+        return paths
+    
+    @staticmethod
+    def load_image(image_path: str, decode_scale: int = 1) -> Optional[np.ndarray]:
+        """
+        讀取圖像，可在解碼時直接縮小以減少解碼的像素數
+        
+        Args:
+            image_path: 圖像檔案路徑
+            decode_scale: 縮小倍數 (1、2、4 或 8)
+            
+        Returns:
+            BGR 圖像，載入失敗時返回 None
+        """
+        if decode_scale == 1:
+            return cv2.imread(image_path)
+        if decode_scale not in REDUCED_DECODE_FLAGS:
+            raise ValueError(f"不支援的解碼縮小倍數: {decode_scale}")
+        return cv2.imread(image_path, REDUCED_DECODE_FLAGS[decode_scale])
+    
     @staticmethod
     def validate_image(image: np.ndarray) -> bool:
         """驗證圖像是否有效"""
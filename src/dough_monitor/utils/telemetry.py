@@ -0,0 +1,315 @@
+"""
+遙測匯出 - 批次上傳量測結果，離線時暫存到磁碟並於恢復連線後限速補傳
+"""
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SPOOL_PREFIX = 'batch_'
+SPOOL_SUFFIX = '.json'
+
+# 關閉時放入佇列以喚醒等待中的背景執行緒
+_WAKE = object()
+
+
+def _json_default(value):
+    """將 NumPy 型別轉為可序列化的 Python 型別"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"無法序列化的型別: {type(value).__name__}")
+
+
+def summarize_detection(result: Dict) -> Dict:
+    """
+    從 detect_dough_pixels 的結果中取出可上傳的數值欄位 (不含遮罩)
+
+    Args:
+        result: 檢測結果字典
+
+    Returns:
+        只包含純量欄位的字典
+    """
+    return {key: value for key, value in result.items()
+            if not isinstance(value, np.ndarray) or value.ndim == 0}
+
+
+class TelemetryExporter:
+    """以 HTTP 持久連線批次上傳量測結果的背景匯出器"""
+
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 spool_dir: str,
+                 path: str = '/telemetry',
+                 device_id: Optional[str] = None,
+                 batch_size: int = 50,
+                 flush_interval: float = 5.0,
+                 max_queue: int = 1000,
+                 max_spool_bytes: int = 10 * 1024 * 1024,
+                 drain_rate: float = 2.0,
+                 retry_interval: float = 10.0,
+                 timeout: float = 5.0):
+        """
+        初始化並啟動匯出器
+
+        Args:
+            host: 接收端主機
+            port: 接收端連接埠
+            spool_dir: 離線暫存目錄
+            path: 上傳的 HTTP 路徑
+            device_id: 裝置識別碼，預設為主機名稱
+            batch_size: 每批最多的樣本數
+            flush_interval: 未滿一批時最長等待秒數
+            max_queue: 記憶體中最多暫存的樣本數，超過時丟棄最舊的樣本
+            max_spool_bytes: 磁碟暫存上限，超過時刪除最舊的批次
+            drain_rate: 恢復連線後每秒最多補傳的批次數
+            retry_interval: 連線失敗後多久再重試 (秒)
+            timeout: 連線與讀寫逾時 (秒)
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.spool_dir = spool_dir
+        self.device_id = device_id or socket.gethostname()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_spool_bytes = max_spool_bytes
+        self.drain_rate = drain_rate
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+
+        self.stats = {
+            'sent_batches': 0,
+            'sent_samples': 0,
+            'spooled_batches': 0,
+            'dropped_samples': 0,
+            'rejected_batches': 0,
+        }
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._next_attempt = 0.0
+        self._drain_tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._spool_seq = 0
+
+        os.makedirs(spool_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='dough-telemetry',
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, sample: Dict) -> None:
+        """
+        加入一筆樣本 (不會阻塞分析迴圈)
+
+        Args:
+            sample: 量測結果；會自動加上時間戳記
+        """
+        record = dict(sample)
+        record.setdefault('ts', time.time())
+        while True:
+            try:
+                self._queue.put_nowait(record)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._count('dropped_samples')
+                except queue.Empty:
+                    pass
+
+    def close(self, timeout: float = 10.0) -> None:
+        """送出或暫存剩餘樣本並停止背景執行緒"""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass  # 佇列非空，背景執行緒不會停在等待
+        self._thread.join(timeout)
+
+    @property
+    def spool_files(self) -> List[str]:
+        """目前暫存在磁碟上的批次檔 (由舊到新)"""
+        return sorted(name for name in os.listdir(self.spool_dir)
+                      if name.startswith(SPOOL_PREFIX) and name.endswith(SPOOL_SUFFIX))
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _run(self) -> None:
+        while True:
+            stopping = self._stop.is_set()
+            batch = self._collect(stopping)
+            if batch:
+                self._handle_batch(batch)
+            self._drain_spool()
+            if stopping and self._queue.empty():
+                break
+        self._close_connection()
+
+    def _collect(self, stopping: bool) -> List[Dict]:
+        """收集一批樣本；有待補傳的批次時縮短等待時間以維持補傳速率"""
+        wait = self.flush_interval
+        if self.spool_files:
+            wait = min(wait, 1.0 / self.drain_rate)
+        deadline = time.monotonic() + wait
+        batch: List[Dict] = []
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if stopping or remaining <= 0:
+                    record = self._queue.get_nowait()
+                else:
+                    record = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if record is _WAKE:
+                stopping = True
+                continue
+            batch.append(record)
+        return batch
+
+    def _handle_batch(self, batch: List[Dict]) -> None:
+        payload = json.dumps({'device_id': self.device_id, 'samples': batch},
+                             default=_json_default).encode()
+        # 有待補傳的批次時，新批次排在其後以維持順序
+        if self.spool_files or time.monotonic() < self._next_attempt:
+            self._spool(payload, len(batch))
+        elif not self._send(payload, len(batch)):
+            self._spool(payload, len(batch))
+
+    def _drain_spool(self) -> None:
+        """連線恢復後依 drain_rate 限速補傳暫存的批次"""
+        now = time.monotonic()
+        refill = (now - self._last_refill) * self.drain_rate
+        self._drain_tokens = min(1.0, self._drain_tokens + refill)
+        self._last_refill = now
+
+        while self._drain_tokens >= 1.0 and now >= self._next_attempt:
+            files = self.spool_files
+            if not files:
+                return
+            path = os.path.join(self.spool_dir, files[0])
+            with open(path, 'rb') as f:
+                payload = f.read()
+            samples = self._sample_count(payload)
+            if samples is None:
+                # 損壞的暫存檔 (例如寫入時斷電)
+                os.remove(path)
+                continue
+            self._drain_tokens -= 1.0
+            if not self._send(payload, samples):
+                return
+            os.remove(path)
+
+    def _send(self, payload: bytes, samples: int) -> bool:
+        """
+        以持久連線上傳一批
+
+        Returns:
+            True 表示已送達 (或被接收端拒絕而不再重送)，False 表示需稍後重試
+        """
+        response = self._request(payload)
+        if response is None:
+            self._close_connection()
+            self._next_attempt = time.monotonic() + self.retry_interval
+            return False
+
+        if response.will_close:
+            self._close_connection()
+        if 200 <= response.status < 300:
+            self._count('sent_batches')
+            self._count('sent_samples', samples)
+            return True
+        if 400 <= response.status < 500:
+            # 資料本身有問題，重送也不會成功
+            self._count('rejected_batches')
+            self._count('dropped_samples', samples)
+            return True
+        self._next_attempt = time.monotonic() + self.retry_interval
+        return False
+
+    def _request(self, payload: bytes) -> Optional[http.client.HTTPResponse]:
+        """
+        送出 POST 並讀取回應
+
+        沿用的持久連線可能已被接收端因閒置而關閉，此時在收到任何回應前就會失敗；
+        這種情況以新連線重試一次，不視為離線。
+
+        Returns:
+            已讀完內容的回應，連線失敗時回傳 None
+        """
+        for _ in range(2):
+            reused = self._conn is not None
+            try:
+                if self._conn is None:
+                    self._conn = http.client.HTTPConnection(self.host, self.port,
+                                                            timeout=self.timeout)
+                self._conn.request('POST', self.path, body=payload, headers={
+                    'Content-Type': 'application/json',
+                    'Connection': 'keep-alive',
+                })
+                response = self._conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                self._close_connection()
+                if reused:
+                    continue
+                return None
+            try:
+                response.read()
+            except (OSError, http.client.HTTPException):
+                return None
+            return response
+        return None
+
+    def _spool(self, payload: bytes, samples: int) -> None:
+        """將批次寫入磁碟暫存，超過上限時刪除最舊的批次"""
+        self._spool_seq += 1
+        stamp = f"{time.time_ns():020d}_{self._spool_seq:06d}"
+        name = f"{SPOOL_PREFIX}{stamp}{SPOOL_SUFFIX}"
+        path = os.path.join(self.spool_dir, name)
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._count('dropped_samples', samples)
+            return
+        self._count('spooled_batches')
+        self._enforce_spool_limit()
+
+    def _enforce_spool_limit(self) -> None:
+        files = self.spool_files
+        sizes = [os.path.getsize(os.path.join(self.spool_dir, name)) for name in files]
+        total = sum(sizes)
+        for name in files:
+            if total <= self.max_spool_bytes:
+                break
+            path = os.path.join(self.spool_dir, name)
+            with open(path, 'rb') as f:
+                self._count('dropped_samples', self._sample_count(f.read()) or 0)
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    @staticmethod
+    def _sample_count(payload: bytes) -> Optional[int]:
+        """取得批次內的樣本數，內容損壞時回傳 None"""
+        try:
+            return len(json.loads(payload)['samples'])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _close_connection(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
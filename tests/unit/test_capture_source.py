@@ -0,0 +1,216 @@
+"""
+影像來源與負載測試單元測試
+"""
+import cv2
+import numpy as np
+import pytest
+from src.dough_monitor.core.detector import DoughDetector
+from src.dough_monitor.utils.capture_source import (
+    ReplaySource, SyntheticDoughSource, run_load_test)
+
+
+class FakeClock:
+    """可手動推進的假時鐘"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestSyntheticDoughSource:
+    """SyntheticDoughSource 類別的測試"""
+
+    def test_frame_shape(self):
+        """測試輸出影像尺寸"""
+        source = SyntheticDoughSource(width=160, height=120, realtime=False, seed=0)
+
+        ok, frame = source.read()
+
+        assert ok
+        assert frame.shape == (120, 160, 3)
+        assert frame.dtype == np.uint8
+
+    def test_deterministic_with_seed(self):
+        """測試相同種子產生相同影像"""
+        a = SyntheticDoughSource(width=64, height=48, realtime=False, seed=1)
+        b = SyntheticDoughSource(width=64, height=48, realtime=False, seed=1)
+
+        np.testing.assert_array_equal(a.read()[1], b.read()[1])
+
+    def test_dough_rises(self):
+        """測試麵團面積隨幀數增加"""
+        source = SyntheticDoughSource(width=160, height=120, growth_per_frame=0.05,
+                                      lighting_drift=0, realtime=False, seed=0)
+        detector = DoughDetector()
+
+        early = detector.detect_dough_pixels(source.render(0))['dough_pixels']
+        late = detector.detect_dough_pixels(source.render(10))['dough_pixels']
+
+        assert 0 < early < late
+
+    def test_detected_with_default_noise(self):
+        """測試預設雜訊下麵團仍能被檢測到，且面積隨幀數增加"""
+        source = SyntheticDoughSource(width=320, height=240, realtime=False, seed=0)
+        clean = SyntheticDoughSource(width=320, height=240, noise_sigma=0,
+                                     realtime=False, seed=0)
+        detector = DoughDetector()
+
+        counts = [detector.detect_dough_pixels(source.render(i))['dough_pixels']
+                  for i in (0, 50, 100, 150)]
+        expected = detector.detect_dough_pixels(clean.render(0))['dough_pixels']
+
+        assert counts[0] == pytest.approx(expected, rel=0.05)
+        assert counts == sorted(counts)
+        assert counts[0] < counts[-1]
+
+    def test_noise_shared_across_channels(self):
+        """測試雜訊為亮度雜訊：三個通道的偏移相同，不改變色相"""
+        source = SyntheticDoughSource(width=64, height=48, lighting_drift=0,
+                                      realtime=False, seed=0)
+
+        frame = source.render(0).astype(np.int16)
+        background = frame[:4, :4].reshape(-1, 3)
+        unsaturated = (background > 0).all(axis=1)
+
+        diff = background[unsaturated] - np.array([60, 55, 50])
+        assert (diff[:, 0] == diff[:, 1]).all() and (diff[:, 1] == diff[:, 2]).all()
+        assert diff.std() > 0
+
+    def test_noise_pattern_pool(self):
+        """測試雜訊圖樣為少量單一平面的 uint8 陣列，並輪流使用"""
+        source = SyntheticDoughSource(width=64, height=48, noise_patterns=3,
+                                      growth_per_frame=0, lighting_drift=0,
+                                      realtime=False, seed=0)
+
+        assert source._noise_pos.shape == (3, 48, 64)
+        assert source._noise_pos.dtype == np.uint8
+        np.testing.assert_array_equal(source.render(0), source.render(3))
+        assert not np.array_equal(source.render(0), source.render(1))
+
+    def test_multiple_containers(self):
+        """測試多個容器"""
+        source = SyntheticDoughSource(width=300, height=100, containers=3,
+                                      realtime=False, seed=0)
+        mask = DoughDetector().detect_dough_pixels(source.render(0))['mask']
+
+        count, _ = cv2.connectedComponents(mask)
+
+        assert count - 1 == 3
+
+    def test_max_frames(self):
+        """測試幀數上限"""
+        source = SyntheticDoughSource(width=32, height=24, max_frames=2, realtime=False)
+
+        assert source.read()[0]
+        assert source.read()[0]
+        assert source.read() == (False, None)
+
+    def test_realtime_paces_and_drops(self):
+        """測試即時模式依 FPS 等待，消費端太慢時丟幀"""
+        clock = FakeClock()
+        source = SyntheticDoughSource(width=32, height=24, fps=10,
+                                      clock=clock, sleep=clock.sleep)
+
+        source.read()
+        source.read()
+        assert clock.now == pytest.approx(100.1)
+        assert source.dropped_frames == 0
+
+        clock.advance(0.35)  # 第 2、3 幀已過時
+        source.read()
+        assert source.dropped_frames == 2
+
+
+class TestReplaySource:
+    """ReplaySource 類別的測試"""
+
+    def _write_images(self, directory, count):
+        for i in range(count):
+            cv2.imwrite(str(directory / f"frame_{i:02d}.png"),
+                        np.full((10, 10, 3), i * 20, dtype=np.uint8))
+
+    def test_directory_in_order(self, tmp_path):
+        """測試依檔名順序重播目錄"""
+        self._write_images(tmp_path, 3)
+        source = ReplaySource(str(tmp_path), realtime=False)
+
+        values = [source.read()[1][0, 0, 0] for _ in range(3)]
+
+        assert values == [0, 20, 40]
+        assert source.read() == (False, None)
+
+    def test_directory_loop(self, tmp_path):
+        """測試循環重播"""
+        self._write_images(tmp_path, 2)
+        source = ReplaySource(str(tmp_path), realtime=False, loop=True)
+
+        values = [source.read()[1][0, 0, 0] for _ in range(5)]
+
+        assert values == [0, 20, 0, 20, 0]
+
+    def test_empty_directory(self, tmp_path):
+        """測試空目錄"""
+        with pytest.raises(FileNotFoundError, match="目錄中沒有影像檔"):
+            ReplaySource(str(tmp_path))
+
+    def test_missing_video(self, tmp_path):
+        """測試不存在的影片檔"""
+        with pytest.raises(FileNotFoundError, match="無法開啟影片"):
+            ReplaySource(str(tmp_path / "missing.avi"))
+
+    def test_video_skips_when_behind(self, tmp_path):
+        """測試影片重播跟不上時略過幀"""
+        path = str(tmp_path / "clip.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (16, 16))
+        if not writer.isOpened():
+            pytest.skip("此環境的 OpenCV 不支援寫入影片")
+        for i in range(6):
+            writer.write(np.full((16, 16, 3), i * 40, dtype=np.uint8))
+        writer.release()
+
+        clock = FakeClock()
+        source = ReplaySource(path, clock=clock, sleep=clock.sleep)
+        source.read()
+        clock.advance(0.35)
+        ok, frame = source.read()
+
+        assert ok
+        assert abs(int(frame[0, 0, 0]) - 120) < 10
+        assert source.dropped_frames == 2
+
+
+class TestLoadTest:
+    """run_load_test 的測試"""
+
+    def test_reports_throughput(self):
+        """測試回報吞吐量與延遲"""
+        clock = FakeClock()
+        source = SyntheticDoughSource(width=32, height=24, fps=10,
+                                      clock=clock, sleep=clock.sleep)
+
+        def slow_process(frame):
+            clock.advance(0.25)  # 分析比影像產生慢
+
+        stats = run_load_test(source, slow_process, max_frames=4, clock=clock)
+
+        assert stats['frames'] == 4
+        assert stats['latency_mean'] == pytest.approx(0.25)
+        assert stats['dropped_frames'] > 0
+        assert 0 < stats['fps'] < 10
+
+    def test_stops_at_end_of_source(self):
+        """測試來源結束時停止"""
+        source = SyntheticDoughSource(width=32, height=24, max_frames=3, realtime=False)
+
+        stats = run_load_test(source, DoughDetector().detect_dough_pixels)
+
+        assert stats['frames'] == 3
+        assert stats['dropped_frames'] == 0
@@ -3,6 +3,7 @@
 """
 import pytest
 import numpy as np
+import cv2
 from unittest.mock import patch, MagicMock
 from src.dough_monitor.core.color_analyzer import ColorAnalyzer
 
@@ -22,6 +23,16 @@ class TestColorAnalyzer:
         assert analyzer.hsv is not None
         mock_imread.assert_called_once_with("test_path.jpg")
     
+    @patch('cv2.imread')
+    def test_init_reduced_decode(self, mock_imread):
+        """測試以縮小解碼初始化"""
+        mock_imread.return_value = np.zeros((50, 50, 3), dtype=np.uint8)
+        
+        analyzer = ColorAnalyzer("test_path.jpg", decode_scale=2)
+        
+        assert analyzer.decode_scale == 2
+        mock_imread.assert_called_once_with("test_path.jpg", cv2.IMREAD_REDUCED_COLOR_2)
+    
     @patch('cv2.imread')
     def test_init_file_not_found(self, mock_imread):
         """測試檔案不存在的情況"""
@@ -0,0 +1,189 @@
+"""
+儀表板伺服器單元測試 (僅連線至 localhost)
+"""
+import asyncio
+import base64
+import http.client
+import json
+import os
+import socket
+import time
+
+import numpy as np
+import pytest
+from src.dough_monitor.utils.dashboard import DashboardServer, _encode_ws_frame
+
+
+def _wait_for(condition, timeout=2.0):
+    """輪詢直到條件成立"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _read_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("連線已關閉")
+        data += chunk
+    return data
+
+
+class TestDashboardServer:
+    """DashboardServer 類別的測試"""
+
+    def setup_method(self):
+        """每個測試方法前啟動伺服器"""
+        self.server = DashboardServer(port=0)
+        self.port = self.server.start()
+        self.image = np.zeros((40, 60, 3), dtype=np.uint8)
+        self.image[10:30, 20:40] = 255
+
+    def teardown_method(self):
+        """每個測試方法後停止伺服器"""
+        self.server.stop()
+
+    def _get(self, path):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+        conn.request('GET', path)
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def test_metrics_empty_before_publish(self):
+        """測試尚未發布時回傳空的 JSON"""
+        response, body = self._get('/metrics')
+
+        assert response.status == 200
+        assert json.loads(body) == {}
+
+    def test_metrics_after_publish(self):
+        """測試發布後可取得指標 (含 NumPy 型別)"""
+        self.server.publish(self.image,
+                            {'dough_pixels': np.int64(400), 'dough_percentage': 16.6})
+
+        response, body = self._get('/metrics')
+
+        assert response.getheader('Content-Type') == 'application/json'
+        assert json.loads(body) == {'dough_pixels': 400, 'dough_percentage': 16.6}
+
+    def test_snapshot_and_index(self):
+        """測試快照與首頁"""
+        self.server.publish(self.image, {})
+
+        response, body = self._get('/snapshot.jpg')
+        assert response.status == 200
+        assert body[:2] == b'\xff\xd8'
+
+        response, body = self._get('/')
+        assert b'/stream.mjpg' in body
+
+    def test_unknown_path(self):
+        """測試未知路徑回傳 404"""
+        response, _ = self._get('/nope')
+        assert response.status == 404
+
+    def test_port_in_use_raises(self):
+        """測試連接埠已被使用時 start() 拋出例外而不是卡住"""
+        other = DashboardServer(port=self.port)
+
+        with pytest.raises(OSError):
+            other.start()
+
+        other.port = 0
+        assert other.start() != self.port
+        other.stop()
+
+    def test_mjpeg_stream(self):
+        """測試 MJPEG 串流會送出最新幀與後續幀"""
+        self.server.publish(self.image, {})
+        sock = socket.create_connection(('127.0.0.1', self.port), timeout=2)
+        sock.sendall(b'GET /stream.mjpg HTTP/1.1\r\nHost: localhost\r\n\r\n')
+
+        data = b''
+        while data.count(b'--frame') < 1 or not data.endswith(b'\xff\xd9\r\n'):
+            data += sock.recv(65536)
+        assert b'multipart/x-mixed-replace; boundary=frame' in data
+
+        self.server.publish(self.image, {})
+        while data.count(b'--frame') < 2 or not data.endswith(b'\xff\xd9\r\n'):
+            data += sock.recv(65536)
+        sock.close()
+
+    def test_websocket_receives_metrics(self):
+        """測試 WebSocket 握手並接收推播的指標"""
+        sock = socket.create_connection(('127.0.0.1', self.port), timeout=2)
+        key = base64.b64encode(os.urandom(16)).decode()
+        sock.sendall(
+            ('GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n'
+             'Connection: Upgrade\r\nSec-WebSocket-Version: 13\r\n'
+             f'Sec-WebSocket-Key: {key}\r\n\r\n').encode())
+
+        handshake = b''
+        while not handshake.endswith(b'\r\n\r\n'):
+            handshake += sock.recv(1)
+        assert handshake.startswith(b'HTTP/1.1 101')
+        assert _wait_for(lambda: self.server.client_count == 1)
+
+        self.server.publish(self.image, {'dough_pixels': 7})
+        head = _read_exactly(sock, 2)
+        payload = _read_exactly(sock, head[1] & 0x7F)
+
+        assert head[0] == 0x81
+        assert json.loads(payload) == {'dough_pixels': 7}
+
+        # 用戶端送出 (帶遮罩的) 關閉訊框
+        sock.sendall(bytes([0x88, 0x80]) + b'\x00\x00\x00\x00')
+        assert _wait_for(lambda: self.server.client_count == 0)
+        sock.close()
+
+
+class TestFanOut:
+    """多用戶分送與背壓測試"""
+
+    def test_slow_client_drops_oldest(self):
+        """測試慢速用戶的佇列滿時丟棄最舊的幀"""
+        server = DashboardServer(client_queue_size=2)
+        image = np.zeros((10, 10, 3), dtype=np.uint8)
+
+        async def scenario():
+            server._loop = asyncio.get_running_loop()
+            queue = server._subscribe()
+            for i in range(5):
+                server.publish(image, {'i': i})
+                await asyncio.sleep(0)
+            server._loop = None
+            return [queue.get_nowait().seq for _ in range(queue.qsize())]
+
+        seqs = asyncio.run(scenario())
+
+        assert seqs == [4, 5]
+        assert server.dropped_frames == 3
+
+    def test_frame_encoded_once_and_shared(self):
+        """測試所有連線共用同一個已編碼的幀物件"""
+        server = DashboardServer()
+
+        async def scenario():
+            server._loop = asyncio.get_running_loop()
+            queues = [server._subscribe() for _ in range(3)]
+            server.publish(np.zeros((10, 10, 3), dtype=np.uint8), {})
+            await asyncio.sleep(0)
+            server._loop = None
+            return [q.get_nowait() for q in queues]
+
+        frames = asyncio.run(scenario())
+
+        assert frames[0] is frames[1] is frames[2]
+
+    @pytest.mark.parametrize("size,header_len", [(10, 2), (200, 4), (70000, 10)])
+    def test_encode_ws_frame_lengths(self, size, header_len):
+        """測試 WebSocket 訊框長度欄位編碼"""
+        frame = _encode_ws_frame(b'x' * size)
+        assert len(frame) == size + header_len
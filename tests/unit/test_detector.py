@@ -78,6 +78,22 @@ class TestDoughDetector:
         assert result is None
         mock_imread.assert_called_once_with("non_existent.jpg")
     
+    @patch('cv2.imread')
+    def test_detect_from_file_reduced_decode(self, mock_imread):
+        """測試以縮小解碼讀取並換算原始解析度像素數"""
+        mock_imread.return_value = self.test_image
+        
+        result = self.detector.detect_from_file("fake_path.jpg", decode_scale=4)
+        
+        mock_imread.assert_called_once_with("fake_path.jpg", cv2.IMREAD_REDUCED_COLOR_4)
+        assert result['decode_scale'] == 4
+        assert result['full_res_dough_pixels'] == result['dough_pixels'] * 16
+    
+    def test_detect_from_file_invalid_decode_scale(self):
+        """測試不支援的解碼縮小倍數"""
+        with pytest.raises(ValueError, match="不支援的解碼縮小倍數"):
+            self.detector.detect_from_file("fake_path.jpg", decode_scale=3)
+    
     def test_clean_mask(self):
         """測試遮罩清理功能"""
         # 建立有雜訊的遮罩
@@ -149,4 +165,80 @@ class TestDoughDetectorIntegration:
         
         # 驗證遮罩
         assert result['mask'].shape == (200, 200)
-        assert result['original_mask'].shape == (200, 200)
\ No newline at end of file
+        assert result['original_mask'].shape == (200, 200)
+
+
+class TestDoughDetectorTiled:
+    """DoughDetector 帶狀區塊多執行緒分割測試"""
+    
+    @staticmethod
+    def _random_scene(seed: int, height: int = 181, width: int = 97) -> np.ndarray:
+        """建立細碎雜訊很多的圖像，讓形態學運算在區塊邊界附近也有變化"""
+        rng = np.random.default_rng(seed)
+        image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        image[rng.random((height, width)) < 0.55] = 230
+        return image
+    
+    @pytest.mark.parametrize("num_strips", [2, 3, 4, 7, 16])
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_bit_exact_with_untiled(self, num_strips, seed):
+        """測試切割處理的結果與整張處理完全相同"""
+        image = self._random_scene(seed)
+        
+        expected = DoughDetector().detect_dough_pixels(image)
+        with DoughDetector(num_strips=num_strips) as detector:
+            result = detector.detect_dough_pixels(image)
+        
+        assert result['dough_pixels'] == expected['dough_pixels']
+        np.testing.assert_array_equal(result['mask'], expected['mask'])
+        np.testing.assert_array_equal(result['original_mask'],
+                                      expected['original_mask'])
+        assert result['dough_percentage'] == expected['dough_percentage']
+    
+    def test_close_shuts_down_pool(self):
+        """測試 close() 結束執行緒池，之後仍可繼續檢測"""
+        image = self._random_scene(0)
+        detector = DoughDetector(num_strips=4)
+        expected = detector.detect_dough_pixels(image)
+        executor = detector._executor
+        
+        detector.close()
+        
+        assert executor._shutdown
+        assert not any(t.is_alive() for t in executor._threads)
+        again = detector.detect_dough_pixels(image)
+        assert again['dough_pixels'] == expected['dough_pixels']
+        detector.close()
+    
+    def test_context_manager_closes(self):
+        """測試以 with 使用時離開區塊會關閉執行緒池"""
+        with DoughDetector(num_strips=2) as detector:
+            detector.detect_dough_pixels(self._random_scene(1))
+            executor = detector._executor
+        
+        assert detector._executor is None
+        assert executor._shutdown
+    
+    def test_close_without_pool(self):
+        """測試未建立執行緒池時 close() 不會出錯"""
+        DoughDetector().close()
+    
+    def test_halo_covers_morphology(self):
+        """測試重疊列數涵蓋所有侵蝕/膨脹次數"""
+        assert DoughDetector().halo == 8
+    
+    def test_short_image_falls_back(self):
+        """測試圖像太矮時不切割"""
+        detector = DoughDetector(num_strips=8)
+        image = self._random_scene(0, height=10)
+        
+        result = detector.detect_dough_pixels(image)
+        
+        assert detector._executor is None
+        expected = DoughDetector().detect_dough_pixels(image)
+        np.testing.assert_array_equal(result['mask'], expected['mask'])
+    
+    def test_invalid_num_strips(self):
+        """測試無效的區塊數"""
+        with pytest.raises(ValueError, match="num_strips"):
+            DoughDetector(num_strips=0)
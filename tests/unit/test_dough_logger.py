@@ -0,0 +1,152 @@
+"""
+Yocto 結構化日誌單元測試
+"""
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+YOCTO_SRC = os.path.join(os.path.dirname(__file__), '..', '..',
+                         'yocto', 'dough-monitor-src')
+sys.path.insert(0, YOCTO_SRC)
+from dough_logger import StructuredLogger  # noqa: E402
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def read_records(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def make_logger(log_dir, **kwargs):
+    options = dict(flush_interval_s=0.02)
+    options.update(kwargs)
+    return StructuredLogger(str(log_dir), **options)
+
+
+class TestStructuredLogger:
+    """StructuredLogger 類別的測試"""
+
+    def test_writes_json_lines(self, tmp_path):
+        """測試每筆記錄寫成一行 JSON，NumPy 數值可序列化"""
+        logger = make_logger(tmp_path)
+        logger.log("measurement", area_cm2=np.float64(12.5), ids=np.arange(3))
+        logger.log("result", level="error", message="失敗")
+        logger.close()
+
+        records = read_records(logger.path)
+
+        assert [r['event'] for r in records] == ['measurement', 'result']
+        assert records[0]['area_cm2'] == 12.5
+        assert records[0]['ids'] == [0, 1, 2]
+        assert records[1]['level'] == 'error'
+        assert records[1]['message'] == '失敗'
+
+    def test_rotates_by_size_and_compresses(self, tmp_path):
+        """測試超過 max_bytes 時輪替並壓縮舊檔"""
+        logger = make_logger(tmp_path, max_bytes=200, batch_size=1)
+        for i in range(5):
+            logger.log("measurement", index=i, padding="x" * 100)
+        logger.close()
+
+        backups = sorted(name for name in os.listdir(tmp_path) if name.endswith('.gz'))
+        indexes = [r['index'] for name in backups
+                   for r in read_records(str(tmp_path / name))]
+
+        assert len(backups) == 4
+        assert sorted(indexes) == [0, 1, 2, 3]
+        assert [r['index'] for r in read_records(logger.path)] == [4]
+
+    def test_backup_count_keeps_newest(self, tmp_path):
+        """測試只保留最新的 backup_count 個舊檔 (同一秒內輪替超過 10 次)"""
+        logger = make_logger(tmp_path, max_bytes=1, batch_size=1, backup_count=3)
+        for i in range(15):
+            logger.log("measurement", index=i)
+        logger.close()
+
+        backups = [name for name in os.listdir(tmp_path) if name.endswith('.gz')]
+        kept = sorted(r['index'] for name in backups
+                      for r in read_records(str(tmp_path / name)))
+
+        assert kept == [11, 12, 13]
+
+    def test_rotates_by_age_across_restarts(self, tmp_path):
+        """測試重新啟動後以檔案建立時間判斷是否超過 max_age_s"""
+        logger = make_logger(tmp_path, max_age_s=60)
+        logger.log("first")
+        logger.close()
+
+        logger = make_logger(tmp_path, max_age_s=60)
+        logger.log("second")
+        logger.close()
+        assert not any(name.endswith('.gz') for name in os.listdir(tmp_path))
+
+        # 模擬檔案在 2 分鐘前建立 (每次執行都會寫入，最後修改時間仍是現在)
+        with open(logger.start_path, 'w') as f:
+            f.write(repr(time.time() - 120))
+        logger = make_logger(tmp_path, max_age_s=60)
+        logger.log("third")
+        logger.close()
+
+        backups = [name for name in os.listdir(tmp_path) if name.endswith('.gz')]
+        assert len(backups) == 1
+        assert [r['event'] for r in read_records(str(tmp_path / backups[0]))] == \
+            ['first', 'second']
+        assert [r['event'] for r in read_records(logger.path)] == ['third']
+
+    def test_drops_oldest_when_queue_full(self, tmp_path):
+        """測試寫入卡住時丟棄最舊的記錄，並補上 log_dropped 記錄"""
+        logger = make_logger(tmp_path, max_buffer=3)
+        writing = threading.Event()
+        release = threading.Event()
+        original_write = logger._write
+
+        def slow_write(batch):
+            writing.set()
+            release.wait()
+            original_write(batch)
+
+        logger._write = slow_write
+        logger.log("measurement", index=0)
+        assert writing.wait(5)
+
+        for i in range(1, 6):
+            logger.log("measurement", index=i)
+        release.set()
+        logger.close()
+
+        records = read_records(logger.path)
+        assert [r.get('index') for r in records if r['event'] == 'measurement'] == \
+            [0, 3, 4, 5]
+        dropped = [r for r in records if r['event'] == 'log_dropped']
+        assert dropped[0]['count'] == 2
+        assert dropped[0]['level'] == 'warning'
+
+    def test_write_error_counts_dropped(self, tmp_path):
+        """測試寫入失敗時計入丟棄數，恢復後記錄 log_dropped"""
+        logger_path = tmp_path / 'dough_monitor.jsonl'
+        logger_path.mkdir()  # 讓開啟日誌檔失敗
+        logger = make_logger(tmp_path)
+        logger.log("lost")
+        assert wait_until(lambda: logger.dropped == 1)
+
+        logger_path.rmdir()
+        logger.log("kept")
+        logger.close()
+
+        records = read_records(logger.path)
+        assert [r['event'] for r in records] == ['kept', 'log_dropped']
+        assert records[1]['count'] == 1
@@ -0,0 +1,163 @@
+"""
+Yocto 監測腳本側視高度剖面單元測試
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+YOCTO_SRC = os.path.join(os.path.dirname(__file__), '..', '..',
+                         'yocto', 'dough-monitor-src')
+sys.path.insert(0, YOCTO_SRC)
+from dough_monitor import (  # noqa: E402
+    HeightProfileWindow, extract_height_profile, summarize_height_profile)
+
+
+def make_mask(heights, rows=50):
+    """建立側視遮罩：每欄從底部往上填滿指定高度"""
+    mask = np.zeros((rows, len(heights)), dtype=np.uint8)
+    for col, height in enumerate(heights):
+        if height:
+            mask[rows - height:, col] = 255
+    return mask
+
+
+class TestExtractHeightProfile:
+    """extract_height_profile 的測試"""
+
+    def test_column_heights(self):
+        """測試逐欄高度"""
+        profile = extract_height_profile(make_mask([10, 12, 14, 12]))
+
+        np.testing.assert_array_equal(profile, [10, 12, 14, 12])
+
+    def test_empty_columns(self):
+        """測試沒有麵糰的欄位高度為 0"""
+        profile = extract_height_profile(make_mask([0, 10, 10, 0]))
+
+        np.testing.assert_array_equal(profile, [0, 10, 10, 0])
+
+    def test_empty_mask(self):
+        """測試全空遮罩"""
+        profile = extract_height_profile(np.zeros((20, 5), dtype=np.uint8))
+
+        np.testing.assert_array_equal(profile, np.zeros(5))
+
+    def test_holes_count_as_dough(self):
+        """測試麵糰內部的孔洞 (氣泡) 不影響高度"""
+        mask = make_mask([20, 20, 20, 20])
+        mask[35:40, 1:3] = 0
+
+        profile = extract_height_profile(mask)
+
+        np.testing.assert_array_equal(profile, [20, 20, 20, 20])
+
+    def test_ignores_detached_blob(self):
+        """測試與麵糰分離的碎屑不計入高度"""
+        mask = make_mask([10, 10, 10, 10, 10, 10])
+        mask[5:8, 2:4] = 255
+
+        profile = extract_height_profile(mask)
+
+        np.testing.assert_array_equal(profile, [10] * 6)
+
+
+class TestSummarizeHeightProfile:
+    """summarize_height_profile 的測試"""
+
+    def test_statistics(self):
+        """測試平均高度、寬度、截面積與體積"""
+        profile = np.array([0, 10, 20, 30, 0], dtype=np.float64)
+
+        summary = summarize_height_profile(profile, pixel_to_cm_ratio=0.5,
+                                           percentiles=(50,), depth_cm=4.0)
+
+        assert summary['mean_height_cm'] == pytest.approx(10.0)
+        assert summary['p50_height_cm'] == pytest.approx(10.0)
+        assert summary['width_cm'] == pytest.approx(1.5)
+        assert summary['cross_section_cm2'] == pytest.approx(15.0)
+        assert summary['volume_cm3'] == pytest.approx(60.0)
+
+    def test_max_and_high_percentile(self):
+        """測試最大高度為真正的最大值，p98 不受單一突起欄位影響"""
+        profile = np.full(100, 10.0)
+        profile[50] = 40
+
+        summary = summarize_height_profile(profile, pixel_to_cm_ratio=1.0)
+
+        assert summary['max_height_cm'] == pytest.approx(40.0)
+        assert summary['p98_height_cm'] == pytest.approx(10.0)
+
+    def test_no_dough(self):
+        """測試沒有麵糰時回傳 None"""
+        assert summarize_height_profile(np.zeros(10)) is None
+
+
+class TestHeightProfileWindow:
+    """HeightProfileWindow 類別的測試"""
+
+    def test_running_mean(self):
+        """測試視窗內的平均剖面"""
+        window = HeightProfileWindow(size=3)
+
+        window.update(np.array([2.0, 4.0]))
+        result = window.update(np.array([4.0, 8.0]))
+
+        np.testing.assert_allclose(result, [3.0, 6.0])
+
+    def test_evicts_oldest(self):
+        """測試超過視窗大小時移除最舊的剖面"""
+        window = HeightProfileWindow(size=2)
+
+        for value in (100.0, 2.0, 4.0):
+            result = window.update(np.array([value]))
+
+        np.testing.assert_allclose(result, [3.0])
+        assert len(window.profiles) == 2
+
+    def test_resets_when_shape_changes(self):
+        """測試解析度改變時重新開始累計"""
+        window = HeightProfileWindow(size=5)
+        window.update(np.array([100.0, 100.0]))
+
+        result = window.update(np.array([1.0, 2.0, 3.0]))
+
+        np.testing.assert_allclose(result, [1.0, 2.0, 3.0])
+        assert len(window.profiles) == 1
+
+    def test_survives_restart(self, tmp_path):
+        """測試存檔後重新載入，視窗延續到下一次執行"""
+        path = str(tmp_path / 'window.npz')
+        window = HeightProfileWindow(size=3)
+        for value in (100.0, 2.0, 4.0):
+            window.update(np.array([value, value]))
+        window.save(path)
+
+        restored = HeightProfileWindow.load(path, size=3)
+        result = restored.update(np.array([6.0, 6.0]))
+
+        np.testing.assert_allclose(result, [4.0, 4.0])
+        assert len(restored.profiles) == 3
+
+    def test_load_trims_to_smaller_size(self, tmp_path):
+        """測試視窗大小調小時只保留最新的剖面"""
+        path = str(tmp_path / 'window.npz')
+        window = HeightProfileWindow(size=5)
+        for value in (1.0, 2.0, 3.0, 4.0):
+            window.update(np.array([value]))
+        window.save(path)
+
+        restored = HeightProfileWindow.load(path, size=2)
+
+        np.testing.assert_allclose(restored.update(np.array([6.0])), [5.0])
+
+    def test_load_missing_or_corrupt(self, tmp_path):
+        """測試狀態檔不存在或損壞時回傳空視窗"""
+        corrupt = tmp_path / 'corrupt.npz'
+        corrupt.write_bytes(b'garbage')
+
+        for path in (tmp_path / 'missing.npz', corrupt):
+            window = HeightProfileWindow.load(str(path))
+            assert len(window.profiles) == 0
+            assert window.total is None
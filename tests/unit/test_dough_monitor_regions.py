@@ -0,0 +1,220 @@
+"""
+Yocto 監測腳本多容器量測單元測試
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+YOCTO_SRC = os.path.join(os.path.dirname(__file__), '..', '..',
+                         'yocto', 'dough-monitor-src')
+sys.path.insert(0, YOCTO_SRC)
+import dough_monitor  # noqa: E402
+from dough_monitor import RegionTracker, measure_dough_regions  # noqa: E402
+
+
+class TestRegionTracker:
+    """RegionTracker 類別的測試"""
+
+    def test_new_regions_get_new_ids(self):
+        """測試第一幀的區域依序編號"""
+        tracker = RegionTracker()
+
+        ids = tracker.update([[10, 10], [100, 10], [200, 10]])
+
+        np.testing.assert_array_equal(ids, [0, 1, 2])
+
+    def test_ids_follow_moving_centroids(self):
+        """測試質心移動時編號保持不變 (與輸入順序無關)"""
+        tracker = RegionTracker(max_distance=30)
+        tracker.update([[10, 10], [100, 10], [200, 10]])
+
+        ids = tracker.update([[215, 12], [22, 8], [110, 20]])
+
+        np.testing.assert_array_equal(ids, [2, 0, 1])
+
+    def test_greedy_assigns_closest_pair_first(self):
+        """測試兩個區域爭同一軌跡時，較近者取得編號"""
+        tracker = RegionTracker(max_distance=50)
+        tracker.update([[0, 0]])
+
+        ids = tracker.update([[20, 0], [5, 0]])
+
+        np.testing.assert_array_equal(ids, [1, 0])
+
+    def test_beyond_max_distance_gets_new_id(self):
+        """測試移動距離超過 max_distance 時視為新區域"""
+        tracker = RegionTracker(max_distance=30)
+        tracker.update([[10, 10]])
+
+        ids = tracker.update([[50, 10]])
+
+        np.testing.assert_array_equal(ids, [1])
+
+    def test_reappearing_region_keeps_id(self):
+        """測試容器短暫消失後回來時沿用原編號"""
+        tracker = RegionTracker(max_distance=30, max_missed=2)
+        tracker.update([[10, 10], [100, 10]])
+
+        tracker.update([[100, 10]])
+        tracker.update([[100, 10]])
+        ids = tracker.update([[12, 10], [100, 10]])
+
+        np.testing.assert_array_equal(ids, [0, 1])
+
+    def test_expired_region_gets_new_id(self):
+        """測試連續消失超過 max_missed 幀後編號被移除"""
+        tracker = RegionTracker(max_distance=30, max_missed=2)
+        tracker.update([[10, 10], [100, 10]])
+
+        for _ in range(3):
+            tracker.update([[100, 10]])
+        ids = tracker.update([[10, 10], [100, 10]])
+
+        np.testing.assert_array_equal(ids, [2, 1])
+
+    def test_empty_frames(self):
+        """測試空白幀不產生編號，並計入消失次數"""
+        tracker = RegionTracker(max_missed=1)
+
+        assert len(tracker.update(np.empty((0, 2)))) == 0
+
+        tracker.update([[10, 10]])
+        tracker.update([])
+        ids = tracker.update([[10, 10]])
+
+        np.testing.assert_array_equal(ids, [0])
+        tracker.update([])
+        tracker.update([])
+        np.testing.assert_array_equal(tracker.update([[10, 10]]), [1])
+
+
+class TestRegionTrackerPersistence:
+    """RegionTracker 狀態檔的測試 (每次量測都是新的程序)"""
+
+    def test_ids_survive_restart(self, tmp_path):
+        """測試存檔後重新載入，編號延續到下一次執行"""
+        path = str(tmp_path / 'tracker.npz')
+        tracker = RegionTracker(max_distance=30)
+        tracker.update([[10, 10], [100, 10]])
+        tracker.update([[100, 10]])
+        tracker.save(path)
+
+        restored = RegionTracker.load(path, max_distance=30)
+        ids = restored.update([[105, 12], [12, 10], [200, 10]])
+
+        np.testing.assert_array_equal(ids, [1, 0, 2])
+        np.testing.assert_array_equal(restored.missed, [0, 0, 0])
+
+    def test_missing_file_gives_fresh_tracker(self, tmp_path):
+        """測試狀態檔不存在時從頭編號"""
+        tracker = RegionTracker.load(str(tmp_path / 'missing.npz'))
+
+        assert tracker.next_id == 0
+        assert len(tracker.ids) == 0
+
+    def test_corrupt_file_gives_fresh_tracker(self, tmp_path):
+        """測試狀態檔損壞時從頭編號"""
+        path = tmp_path / 'tracker.npz'
+        path.write_bytes(b'not a zip file')
+
+        tracker = RegionTracker.load(str(path))
+
+        assert tracker.next_id == 0
+
+
+class TestMeasureDoughRegions:
+    """measure_dough_regions 的測試"""
+
+    @pytest.fixture(autouse=True)
+    def _in_tmp_dir(self, tmp_path, monkeypatch):
+        # 除錯影像寫在目前目錄
+        monkeypatch.chdir(tmp_path)
+
+    def _write_scene(self, tmp_path, blobs, name='scene.png'):
+        """在亮背景上畫出深色的方形麵糰，blobs 為 (x, y, 邊長)"""
+        image = np.full((240, 320, 3), 220, dtype=np.uint8)
+        for x, y, size in blobs:
+            cv2.rectangle(image, (x, y), (x + size - 1, y + size - 1), (40, 40, 40), -1)
+        path = str(tmp_path / name)
+        cv2.imwrite(path, image)
+        return path
+
+    def test_measures_each_region(self, tmp_path):
+        """測試每個區域的面積、包圍盒與公分換算"""
+        path = self._write_scene(tmp_path, [(20, 20, 40), (200, 100, 60)])
+
+        regions = measure_dough_regions(path, pixel_to_cm_ratio=0.1, min_area_px=100)
+
+        order = np.argsort(regions['centroids'][:, 0])
+        np.testing.assert_allclose(regions['pixel_areas'][order], [1600, 3600],
+                                   rtol=0.05)
+        np.testing.assert_allclose(regions['bboxes'][order][:, :2],
+                                   [[20, 20], [200, 100]], atol=2)
+        np.testing.assert_allclose(regions['areas_cm2'], regions['pixel_areas'] * 0.01)
+        assert os.path.exists(regions['debug_image_path'])
+
+    def test_min_area_filter(self, tmp_path):
+        """測試小於 min_area_px 的區域被忽略"""
+        path = self._write_scene(tmp_path, [(20, 20, 40), (200, 100, 15)])
+
+        regions = measure_dough_regions(path, min_area_px=500)
+
+        assert len(regions['ids']) == 1
+
+    @pytest.mark.parametrize('decode_scale', [2, 4])
+    def test_decode_scale_reports_full_resolution(self, tmp_path, decode_scale):
+        """測試縮小解碼時面積門檻與回傳像素值皆以原始解析度計算"""
+        path = self._write_scene(tmp_path,
+                                 [(20, 20, 40), (200, 100, 60), (120, 180, 20)])
+
+        full = measure_dough_regions(path, pixel_to_cm_ratio=0.1, min_area_px=1000)
+        reduced = measure_dough_regions(path, pixel_to_cm_ratio=0.1, min_area_px=1000,
+                                        decode_scale=decode_scale)
+
+        assert len(full['ids']) == len(reduced['ids']) == 2
+        np.testing.assert_allclose(np.sort(reduced['pixel_areas']),
+                                   np.sort(full['pixel_areas']), rtol=0.15)
+        np.testing.assert_allclose(np.sort(reduced['areas_cm2']),
+                                   np.sort(full['areas_cm2']), rtol=0.15)
+
+        def by_x(centroids):
+            return centroids[np.argsort(centroids[:, 0])]
+
+        np.testing.assert_allclose(by_x(reduced['centroids']), by_x(full['centroids']),
+                                   atol=decode_scale)
+
+    def test_tracker_across_frames(self, tmp_path):
+        """測試搭配追蹤器時，容器移動後編號不變"""
+        tracker = RegionTracker(max_distance=40)
+        first = measure_dough_regions(
+            self._write_scene(tmp_path, [(20, 20, 40), (200, 100, 60)], 'a.png'),
+            min_area_px=100, tracker=tracker)
+        second = measure_dough_regions(
+            self._write_scene(tmp_path, [(30, 25, 44), (190, 110, 62)], 'b.png'),
+            min_area_px=100, tracker=tracker)
+
+        def ids_by_x(regions):
+            return list(regions['ids'][np.argsort(regions['centroids'][:, 0])])
+
+        assert ids_by_x(first) == ids_by_x(second)
+
+    def test_no_regions(self, tmp_path):
+        """測試沒有麵糰時回傳空陣列"""
+        path = self._write_scene(tmp_path, [])
+
+        regions = measure_dough_regions(path)
+
+        assert len(regions['ids']) == 0
+
+    def test_missing_image(self, tmp_path):
+        """測試無法載入影像時回傳 None"""
+        assert measure_dough_regions(str(tmp_path / 'missing.png')) is None
+
+
+@pytest.fixture(autouse=True)
+def _no_logger(monkeypatch):
+    # 測試時不寫入結構化日誌，訊息直接輸出
+    monkeypatch.setattr(dough_monitor, 'LOGGER', None)
@@ -0,0 +1,60 @@
+"""
+Yocto 監測腳本單一麵糰量測單元測試
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+YOCTO_SRC = os.path.join(os.path.dirname(__file__), '..', '..',
+                         'yocto', 'dough-monitor-src')
+sys.path.insert(0, YOCTO_SRC)
+import dough_monitor  # noqa: E402
+from dough_monitor import measure_dough_size  # noqa: E402
+
+
+class TestMeasureDoughSize:
+    """measure_dough_size 的測試"""
+
+    @pytest.fixture(autouse=True)
+    def _capture_reports(self, tmp_path, monkeypatch):
+        # 除錯影像寫在目前目錄；攔截日誌欄位以檢查記錄的數值
+        monkeypatch.chdir(tmp_path)
+        self.records = []
+        monkeypatch.setattr(dough_monitor, 'report',
+                            lambda event, message, level="info", **fields:
+                            self.records.append(fields))
+
+    def _write_scene(self, tmp_path):
+        image = np.full((240, 320, 3), 220, dtype=np.uint8)
+        cv2.rectangle(image, (100, 60), (179, 179), (40, 40, 40), -1)
+        path = str(tmp_path / 'scene.png')
+        cv2.imwrite(path, image)
+        return path
+
+    def test_measures_largest_contour(self, tmp_path):
+        """測試面積與高度的公分換算"""
+        area, height, debug_path = measure_dough_size(self._write_scene(tmp_path),
+                                                      pixel_to_cm_ratio=0.1)
+
+        assert area == pytest.approx(80 * 120 * 0.01, rel=0.05)
+        assert height == pytest.approx(12.0, rel=0.05)
+        assert os.path.exists(debug_path)
+
+    @pytest.mark.parametrize('decode_scale', [2, 4])
+    def test_decode_scale_logs_full_resolution_pixels(self, tmp_path, decode_scale):
+        """測試縮小解碼時記錄的像素值與公分值皆與原始解析度一致"""
+        path = self._write_scene(tmp_path)
+
+        measure_dough_size(path, pixel_to_cm_ratio=0.1)
+        measure_dough_size(path, pixel_to_cm_ratio=0.1, decode_scale=decode_scale)
+        full, reduced = self.records
+
+        for key in ('pixel_area', 'pixel_height', 'area_cm2', 'height_cm'):
+            assert reduced[key] == pytest.approx(full[key], rel=0.1), key
+
+    def test_missing_image(self, tmp_path):
+        """測試無法載入影像時回傳 None"""
+        assert measure_dough_size(str(tmp_path / 'missing.png')) == (None, None, None)
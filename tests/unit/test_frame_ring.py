@@ -0,0 +1,155 @@
+"""
+共享記憶體環形緩衝區單元測試
+"""
+import multiprocessing
+
+import numpy as np
+import pytest
+from src.dough_monitor.core.detector import DoughDetector
+from src.dough_monitor.utils.frame_ring import FrameReader, FrameRing
+
+SHAPE = (20, 30, 3)
+
+
+def _producer(name, count):
+    """子行程：連接既有緩衝區並直接寫入槽位"""
+    ring = FrameRing.attach(name, SHAPE, slots=4)
+    for i in range(1, count + 1):
+        seq, view = ring.begin_write()
+        view.fill(i)
+        del view
+        ring.commit(seq)
+    ring.close()
+
+
+class TestFrameRing:
+    """FrameRing 類別的測試"""
+
+    def setup_method(self):
+        """每個測試方法前建立緩衝區"""
+        self.ring = FrameRing(SHAPE, slots=4)
+
+    def teardown_method(self):
+        """每個測試方法後刪除緩衝區"""
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_invalid_slots(self):
+        """測試槽位數量不足"""
+        with pytest.raises(ValueError, match="槽位數量至少為 2"):
+            FrameRing(SHAPE, slots=1)
+
+    def test_empty_ring(self):
+        """測試空的緩衝區"""
+        assert self.ring.latest_seq == 0
+        assert self.ring.read(0) is None
+        assert self.ring.read(1) is None
+
+    def test_write_and_read_is_zero_copy(self):
+        """測試讀取回傳共享記憶體上的視圖"""
+        frame = np.full(SHAPE, 7, dtype=np.uint8)
+
+        seq = self.ring.write(frame)
+        view = self.ring.read(seq)
+
+        assert seq == 1
+        np.testing.assert_array_equal(view, frame)
+        assert not view.flags['OWNDATA']
+        assert np.shares_memory(view, self.ring._frames)
+
+    def test_uncommitted_slot_not_readable(self):
+        """測試寫入中的槽位不可讀取"""
+        seq, view = self.ring.begin_write()
+        view.fill(1)
+
+        assert self.ring.read(seq) is None
+        self.ring.commit(seq)
+        assert self.ring.read(seq) is not None
+
+    def test_overwritten_frame_invalid(self):
+        """測試繞回覆寫後舊序號失效"""
+        first = self.ring.write(np.zeros(SHAPE, dtype=np.uint8))
+        for _ in range(4):
+            self.ring.write(np.ones(SHAPE, dtype=np.uint8))
+
+        assert not self.ring.is_valid(first)
+        assert self.ring.read(first) is None
+        assert self.ring.is_valid(self.ring.latest_seq)
+
+    def test_cross_process_producer(self):
+        """測試其他行程以名稱連接並寫入"""
+        process = multiprocessing.get_context('spawn').Process(
+            target=_producer, args=(self.ring.name, 6))
+        process.start()
+        process.join(timeout=30)
+
+        assert process.exitcode == 0
+        assert self.ring.latest_seq == 6
+        assert self.ring.read(6)[0, 0, 0] == 6
+        assert self.ring.read(2) is None
+
+
+class TestFrameReader:
+    """FrameReader 類別的測試"""
+
+    def setup_method(self):
+        """每個測試方法前建立緩衝區"""
+        self.ring = FrameRing(SHAPE, slots=4)
+
+    def teardown_method(self):
+        """每個測試方法後刪除緩衝區"""
+        self.ring.close()
+        self.ring.unlink()
+
+    def _write(self, count):
+        for i in range(count):
+            self.ring.write(np.full(SHAPE, i + 1, dtype=np.uint8))
+
+    def test_reads_in_order(self):
+        """測試依序讀取"""
+        reader = FrameReader(self.ring)
+        self._write(2)
+
+        assert reader.next(timeout=0)[0] == 1
+        assert reader.next(timeout=0)[0] == 2
+        assert reader.next(timeout=0) is None
+        assert reader.dropped == 0
+
+    def test_drop_oldest_when_behind(self):
+        """測試讀取者落後時跳過最舊的幀並計數"""
+        reader = FrameReader(self.ring)
+        self._write(10)
+
+        seq, frame = reader.next(timeout=0)
+
+        assert seq == 8
+        assert frame[0, 0, 0] == 8
+        assert reader.dropped == 7
+
+    def test_workers_split_frames(self):
+        """測試多個 worker 依序號分工"""
+        readers = [FrameReader(self.ring, i, 2) for i in range(2)]
+        self._write(3)
+
+        assert readers[0].next(timeout=0)[0] == 2
+        assert readers[1].next(timeout=0)[0] == 1
+        assert readers[1].next(timeout=0)[0] == 3
+        assert readers[0].next(timeout=0) is None
+
+    def test_invalid_worker_index(self):
+        """測試無效的 worker 索引"""
+        with pytest.raises(ValueError, match="worker_index"):
+            FrameReader(self.ring, 2, 2)
+
+    def test_detector_on_shared_view(self):
+        """測試檢測器直接處理共享記憶體視圖"""
+        seq, view = self.ring.begin_write()
+        view.fill(0)
+        view[5:15, 10:20] = 255
+        self.ring.commit(seq)
+
+        _, frame = FrameReader(self.ring).next(timeout=0)
+        result = DoughDetector().detect_dough_pixels(frame)
+
+        assert result['dough_pixels'] > 0
+        assert self.ring.is_valid(seq)
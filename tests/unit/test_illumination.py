@@ -0,0 +1,179 @@
+"""
+光照正規化器單元測試
+"""
+import pytest
+import numpy as np
+import cv2
+from src.dough_monitor.core.illumination import IlluminationNormalizer
+from src.dough_monitor.core.detector import DoughDetector
+
+
+def make_scene(brightness: float = 1.0) -> np.ndarray:
+    """建立模擬發酵箱場景：灰色背景與白色麵團，整體乘上亮度係數"""
+    image = np.full((120, 160, 3), 120, dtype=np.uint8)
+    cv2.circle(image, (80, 60), 30, (230, 230, 230), -1)
+    return cv2.convertScaleAbs(image, alpha=brightness)
+
+
+def make_grown_scene(fraction: float) -> np.ndarray:
+    """建立固定光照下的場景：麵團為置中的矩形，佔畫面 fraction 的面積"""
+    image = np.full((120, 160, 3), 120, dtype=np.uint8)
+    h, w = int(120 * fraction ** 0.5), int(160 * fraction ** 0.5)
+    y0, x0 = (120 - h) // 2, (160 - w) // 2
+    image[y0:y0 + h, x0:x0 + w] = 230
+    return image
+
+
+class TestIlluminationNormalizer:
+    """IlluminationNormalizer 類別的測試"""
+
+    def test_invalid_method(self):
+        """測試不支援的方法"""
+        with pytest.raises(ValueError, match="不支援的正規化方法"):
+            IlluminationNormalizer(method='foo')
+
+    def test_invalid_alpha(self):
+        """測試無效的 alpha"""
+        with pytest.raises(ValueError, match="alpha"):
+            IlluminationNormalizer(alpha=0)
+
+    def test_none_image(self):
+        """測試 None 圖像應該拋出異常"""
+        with pytest.raises(ValueError, match="輸入圖像不能為 None"):
+            IlluminationNormalizer().normalize(None)
+
+    def test_first_frame_unchanged(self):
+        """測試第一幀作為參考水準，輸出不變"""
+        normalizer = IlluminationNormalizer()
+        image = make_scene()
+
+        result = normalizer.normalize(image)
+
+        np.testing.assert_array_equal(result, image)
+        assert normalizer.target_level == normalizer.level
+
+    def test_ema_compensates_dimming(self):
+        """測試燈光變暗後亮度逐漸被拉回參考水準"""
+        normalizer = IlluminationNormalizer(alpha=0.5)
+        normalizer.normalize(make_scene())
+
+        dimmed = make_scene(0.7)
+        for _ in range(20):
+            result = normalizer.normalize(dimmed)
+
+        assert abs(int(result[60, 80, 0]) - 230) <= 2
+        assert abs(int(result[5, 5, 0]) - 120) <= 2
+
+    def test_update_is_incremental(self):
+        """測試光照水準以 EMA 增量更新"""
+        normalizer = IlluminationNormalizer(alpha=0.25, target_level=100)
+        normalizer.update(np.full((64, 64, 3), 100, dtype=np.uint8))
+        level = normalizer.update(np.full((64, 64, 3), 20, dtype=np.uint8))
+
+        assert level == pytest.approx(80.0)
+        assert normalizer.target_level == 100
+
+    def test_level_ignores_dough_inside_border(self):
+        """測試未提供遮罩時以外圍邊框估計光照，麵團佔大半畫面也不影響"""
+        normalizer = IlluminationNormalizer()
+
+        level = normalizer.update(make_grown_scene(0.7))
+
+        assert level == pytest.approx(120)
+
+    def test_level_excludes_foreground(self):
+        """測試提供麵團遮罩時，遮罩範圍不計入光照水準"""
+        normalizer = IlluminationNormalizer()
+        image = np.full((120, 160, 3), 230, dtype=np.uint8)
+        image[:, :20] = 120  # 麵團佔滿邊框，只剩左側是背景
+        foreground = np.zeros((120, 160), dtype=np.uint8)
+        foreground[:, 20:] = 255
+
+        level = normalizer.update(image, foreground=foreground)
+
+        assert level == pytest.approx(120)
+
+    def test_no_background_keeps_level(self):
+        """測試遮罩涵蓋整個畫面時維持原本的光照水準"""
+        normalizer = IlluminationNormalizer(target_level=120)
+        normalizer.update(make_scene())
+        full = np.full((120, 160), 255, dtype=np.uint8)
+
+        level = normalizer.update(np.full((120, 160, 3), 230, dtype=np.uint8), full)
+
+        assert level == pytest.approx(120)
+
+    def test_flat_field_corrects_vignetting(self):
+        """測試平場圖校正左右亮度不均"""
+        ramp = np.tile(np.linspace(100, 200, 160, dtype=np.float32), (120, 1))
+        flat = cv2.merge([ramp.astype(np.uint8)] * 3)
+        normalizer = IlluminationNormalizer()
+        normalizer.set_flat_field(flat)
+
+        result = normalizer.normalize(flat)
+
+        # 左右兩側的亮度差應大幅縮小
+        assert abs(int(result[60, 20, 0]) - int(result[60, 140, 0])) < 20
+
+    def test_flat_field_gain_cached(self):
+        """測試全尺寸平場增益只計算一次"""
+        normalizer = IlluminationNormalizer()
+        normalizer.set_flat_field(make_scene())
+        normalizer.normalize(make_scene())
+        cached = normalizer._flat_gain_full
+
+        normalizer.normalize(make_scene())
+
+        assert normalizer._flat_gain_full is cached
+
+    def test_clahe_method(self):
+        """測試 CLAHE 方法輸出形狀與型別"""
+        normalizer = IlluminationNormalizer(method='clahe')
+
+        result = normalizer.normalize(make_scene(0.6))
+
+        assert result.shape == (120, 160, 3)
+        assert result.dtype == np.uint8
+
+    def test_reset_keeps_explicit_target(self):
+        """測試重設後保留使用者指定的目標亮度"""
+        normalizer = IlluminationNormalizer(target_level=150)
+        normalizer.update(make_scene())
+
+        normalizer.reset()
+
+        assert normalizer.level is None
+        assert normalizer.target_level == 150
+
+
+class TestDetectorWithNormalizer:
+    """DoughDetector 搭配光照正規化的整合測試"""
+
+    def test_detection_survives_dimming(self):
+        """測試燈光變暗後仍能檢測到麵團"""
+        dimmed = make_scene(0.7)  # 麵團亮度 161，低於 V_min=180
+
+        plain = DoughDetector().detect_dough_pixels(dimmed)
+        assert plain['dough_pixels'] == 0
+
+        detector = DoughDetector(normalizer=IlluminationNormalizer())
+        detector.normalizer.normalize(make_scene())
+        for _ in range(100):
+            result = detector.detect_dough_pixels(dimmed)
+
+        assert result['dough_pixels'] > 0
+
+    def test_dough_growth_under_constant_light(self):
+        """測試固定光照下麵團長到超過半個畫面時，檢測結果與未正規化相同"""
+        plain = DoughDetector()
+        detector = DoughDetector(normalizer=IlluminationNormalizer())
+
+        for fraction in np.linspace(0.1, 0.9, 17):
+            scene = make_grown_scene(fraction)
+            expected = plain.detect_dough_pixels(scene)['dough_pixels']
+            result = detector.detect_dough_pixels(scene)
+
+            assert expected > 0
+            assert result['dough_pixels'] == expected
+
+        assert detector.normalizer.level == pytest.approx(120)
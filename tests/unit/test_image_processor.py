@@ -1,8 +1,10 @@
 """
 圖像處理工具單元測試
 """
+import os
 import pytest
 import numpy as np
+import cv2
 from unittest.mock import patch
 from src.dough_monitor.utils.image_processor import ImageProcessor
 
@@ -24,6 +26,22 @@ class TestImageProcessor:
         wrong_dim_image = np.zeros((100, 100), dtype=np.uint8)  # 只有 2 維
         assert ImageProcessor.validate_image(wrong_dim_image) is False
     
+    @pytest.mark.parametrize("scale", [2, 4, 8])
+    def test_load_image_reduced_decode(self, scale):
+        """測試縮小解碼的圖像尺寸"""
+        path = os.path.join(os.path.dirname(__file__), '..', 'fixtures',
+                            'test_images', 'sample_dough_image.jpg')
+        full = ImageProcessor.load_image(path)
+        
+        reduced = ImageProcessor.load_image(path, decode_scale=scale)
+        
+        assert reduced.shape[0] == -(-full.shape[0] // scale)
+        assert reduced.shape[1] == -(-full.shape[1] // scale)
+    
+    def test_load_image_missing_file(self):
+        """測試載入不存在的檔案"""
+        assert ImageProcessor.load_image('non_existent.jpg', decode_scale=2) is None
+    
     def test_calculate_image_stats(self):
         """測試圖像統計資訊計算"""
         test_image = np.zeros((150, 200, 3), dtype=np.uint8)
@@ -72,4 +90,58 @@ class TestImageProcessor:
         
         # 驗證 matplotlib 函數沒有被呼叫
         mock_figure.assert_not_called()
-        mock_show.assert_not_called()
\ No newline at end of file
+        mock_show.assert_not_called()
+
+    def _make_panels(self, count):
+        """建立測試用的分析結果"""
+        panels = []
+        for i in range(count):
+            image = np.full((60, 80, 3), i * 10, dtype=np.uint8)
+            hsv = np.zeros((60, 80, 3), dtype=np.uint8)
+            mask1 = np.zeros((60, 80), dtype=np.uint8)
+            mask2 = np.zeros((60, 80), dtype=np.uint8)
+            mask2[20:40, 20:60] = 255
+            panels.append((image, hsv, mask1, mask2))
+        return panels
+    
+    def test_render_contact_sheet_layout(self):
+        """測試總覽圖的尺寸與格子內容"""
+        panels = self._make_panels(3)
+        
+        sheet = ImageProcessor.render_contact_sheet(panels, tile_size=(40, 30),
+                                                    draw_titles=False)
+        
+        assert sheet.shape == (90, 160, 3)
+        # 第二列原始圖像格子的像素值
+        assert np.all(sheet[30:60, 0:40] == 10)
+        # 清理後遮罩格子 (第四欄) 中心為白色，三個通道相同
+        np.testing.assert_array_equal(sheet[15, 140], [255, 255, 255])
+        np.testing.assert_array_equal(sheet[0, 120], [0, 0, 0])
+    
+    def test_render_contact_sheet_reuses_canvas(self):
+        """測試使用預先配置的畫布"""
+        canvas = np.empty((120, 160, 3), dtype=np.uint8)
+        
+        sheet = ImageProcessor.render_contact_sheet(self._make_panels(2),
+                                                    tile_size=(40, 30), out=canvas)
+        
+        assert sheet.shape == (60, 160, 3)
+        assert np.shares_memory(sheet, canvas)
+    
+    def test_render_contact_sheet_canvas_too_small(self):
+        """測試畫布尺寸不足時拋出異常"""
+        canvas = np.empty((30, 160, 3), dtype=np.uint8)
+        
+        with pytest.raises(ValueError, match="畫布尺寸不足"):
+            ImageProcessor.render_contact_sheet(self._make_panels(2),
+                                                tile_size=(40, 30), out=canvas)
+    
+    def test_save_contact_sheets(self, tmp_path):
+        """測試分批寫出總覽圖"""
+        paths = ImageProcessor.save_contact_sheets(
+            self._make_panels(5), str(tmp_path), tile_size=(40, 30), rows_per_sheet=2)
+        
+        assert [p.split('/')[-1] for p in paths] == [
+            'contact_sheet_000.jpg', 'contact_sheet_001.jpg', 'contact_sheet_002.jpg']
+        assert cv2.imread(paths[0]).shape == (60, 160, 3)
+        assert cv2.imread(paths[2]).shape == (30, 160, 3)
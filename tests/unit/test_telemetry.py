@@ -0,0 +1,248 @@
+"""
+遙測匯出單元測試
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+from src.dough_monitor.utils.telemetry import TelemetryExporter, summarize_detection
+
+
+class MockBroker:
+    """本機的模擬接收端，記錄收到的批次與連線來源"""
+
+    def __init__(self, idle_timeout=None):
+        self.batches = []
+        self.peers = []
+        self.status = 200
+        broker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            timeout = idle_timeout  # 閒置超過此秒數即關閉持久連線
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                if broker.status == 200:
+                    broker.batches.append(json.loads(body))
+                    broker.peers.append(self.client_address)
+                self.send_response(broker.status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def samples(self):
+        return [sample for batch in self.batches for sample in batch['samples']]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def broker():
+    b = MockBroker()
+    yield b
+    b.close()
+
+
+class TestTelemetryExporter:
+    """TelemetryExporter 類別的測試"""
+
+    def _exporter(self, port, spool_dir, **kwargs):
+        options = dict(device_id='oven-1', batch_size=3, flush_interval=0.05,
+                       drain_rate=50.0, retry_interval=0.05)
+        options.update(kwargs)
+        return TelemetryExporter('127.0.0.1', port, str(spool_dir), **options)
+
+    def test_batches_samples(self, broker, tmp_path):
+        """測試樣本依 batch_size 分批上傳"""
+        exporter = self._exporter(broker.port, tmp_path, flush_interval=5.0)
+        for i in range(6):
+            exporter.submit({'area_cm2': i})
+
+        assert wait_until(lambda: len(broker.samples) == 6)
+        exporter.close()
+
+        assert [len(b['samples']) for b in broker.batches] == [3, 3]
+        assert broker.batches[0]['device_id'] == 'oven-1'
+        assert [s['area_cm2'] for s in broker.samples] == list(range(6))
+        assert all('ts' in s for s in broker.samples)
+
+    def test_flushes_partial_batch(self, broker, tmp_path):
+        """測試未滿一批時逾時送出"""
+        exporter = self._exporter(broker.port, tmp_path)
+        exporter.submit({'area_cm2': 1.5})
+
+        assert wait_until(lambda: len(broker.samples) == 1)
+        exporter.close()
+
+    def test_reuses_connection(self, broker, tmp_path):
+        """測試多個批次共用同一個持久連線"""
+        exporter = self._exporter(broker.port, tmp_path, batch_size=1)
+        for i in range(4):
+            exporter.submit({'i': i})
+
+        assert wait_until(lambda: len(broker.batches) == 4)
+        exporter.close()
+
+        assert len(set(broker.peers)) == 1
+
+    def test_reconnects_after_idle_close(self, tmp_path):
+        """測試接收端關閉閒置的持久連線後，以新連線重送而不暫存"""
+        broker = MockBroker(idle_timeout=0.3)
+        try:
+            exporter = self._exporter(broker.port, tmp_path, retry_interval=10.0)
+            exporter.submit({'i': 0})
+            assert wait_until(lambda: len(broker.samples) == 1)
+
+            time.sleep(0.6)
+            exporter.submit({'i': 1})
+            assert wait_until(lambda: len(broker.samples) == 2)
+            exporter.close()
+        finally:
+            broker.close()
+
+        assert exporter.stats['spooled_batches'] == 0
+        assert len(set(broker.peers)) == 2
+
+    def test_spools_offline_and_drains(self, broker, tmp_path):
+        """測試離線時暫存到磁碟，恢復後依序補傳"""
+        broker.status = 503
+        exporter = self._exporter(broker.port, tmp_path)
+        for i in range(9):
+            exporter.submit({'i': i})
+
+        assert wait_until(lambda: len(exporter.spool_files) == 3)
+        assert broker.batches == []
+
+        broker.status = 200
+        assert wait_until(lambda: len(broker.samples) == 9)
+        exporter.close()
+
+        assert [s['i'] for s in broker.samples] == list(range(9))
+        assert exporter.spool_files == []
+        assert exporter.stats['sent_samples'] == 9
+
+    def test_spool_survives_restart(self, tmp_path):
+        """測試接收端無法連線時關閉，暫存檔於下次啟動時補傳"""
+        unused = MockBroker()
+        port = unused.port
+        unused.close()
+
+        exporter = self._exporter(port, tmp_path)
+        exporter.submit({'i': 0})
+        exporter.close()
+        assert len(exporter.spool_files) == 1
+
+        broker = MockBroker()
+        try:
+            exporter = self._exporter(broker.port, tmp_path)
+            assert wait_until(lambda: len(broker.samples) == 1)
+            exporter.close()
+        finally:
+            broker.close()
+
+        assert exporter.spool_files == []
+
+    def test_drain_rate_is_capped(self, broker, tmp_path):
+        """測試補傳速率受 drain_rate 限制"""
+        broker.status = 503
+        exporter = self._exporter(broker.port, tmp_path, batch_size=1, drain_rate=20.0)
+        for i in range(5):
+            exporter.submit({'i': i})
+        assert wait_until(lambda: len(exporter.spool_files) == 5)
+
+        broker.status = 200
+        start = time.monotonic()
+        assert wait_until(lambda: len(broker.batches) == 5)
+        elapsed = time.monotonic() - start
+        exporter.close()
+
+        # 第一批可立即送出，其餘每批間隔至少 1/20 秒
+        assert elapsed >= 4 / 20 * 0.8
+
+    def test_spool_is_bounded(self, broker, tmp_path):
+        """測試磁碟暫存超過上限時丟棄最舊的批次"""
+        broker.status = 503
+        exporter = self._exporter(broker.port, tmp_path, batch_size=1,
+                                  max_spool_bytes=250, retry_interval=60.0)
+        for i in range(10):
+            exporter.submit({'i': i})
+        assert wait_until(lambda: exporter.stats['spooled_batches'] == 10)
+        exporter.close()
+
+        total = sum((tmp_path / name).stat().st_size for name in exporter.spool_files)
+        kept = [json.loads((tmp_path / name).read_text())['samples'][0]['i']
+                for name in exporter.spool_files]
+        assert total <= 250
+        assert kept == list(range(10 - len(kept), 10))
+        assert exporter.stats['dropped_samples'] == 10 - len(kept)
+
+    def test_rejected_batch_not_retried(self, broker, tmp_path):
+        """測試接收端拒絕 (4xx) 的批次不會重送"""
+        broker.status = 400
+        exporter = self._exporter(broker.port, tmp_path)
+        exporter.submit({'i': 0})
+
+        assert wait_until(lambda: exporter.stats['rejected_batches'] == 1)
+        exporter.close()
+
+        assert exporter.spool_files == []
+        assert exporter.stats['dropped_samples'] == 1
+
+    def test_submit_never_blocks(self, tmp_path):
+        """測試佇列已滿時丟棄最舊的樣本而不阻塞"""
+        exporter = self._exporter(1, tmp_path, max_queue=2, flush_interval=60.0,
+                                  batch_size=100)
+        exporter.close()  # 停止背景執行緒，讓佇列保持已滿
+
+        start = time.monotonic()
+        for i in range(5):
+            exporter.submit({'i': i})
+
+        assert time.monotonic() - start < 0.1
+        assert exporter.stats['dropped_samples'] == 3
+        assert [exporter._queue.get_nowait()['i'] for _ in range(2)] == [3, 4]
+
+    def test_serializes_numpy_values(self, broker, tmp_path):
+        """測試 NumPy 數值可序列化"""
+        exporter = self._exporter(broker.port, tmp_path)
+        exporter.submit({'pixels': np.int64(42), 'ratio': np.float32(0.5)})
+
+        assert wait_until(lambda: len(broker.samples) == 1)
+        exporter.close()
+
+        assert broker.samples[0]['pixels'] == 42
+        assert broker.samples[0]['ratio'] == 0.5
+
+
+class TestSummarizeDetection:
+    """summarize_detection 的測試"""
+
+    def test_drops_masks(self):
+        """測試移除遮罩等陣列欄位"""
+        result = {'dough_pixels': 10, 'dough_percentage': 2.5,
+                  'mask': np.zeros((4, 4), dtype=np.uint8)}
+
+        assert summarize_detection(result) == {'dough_pixels': 10,
+                                               'dough_percentage': 2.5}
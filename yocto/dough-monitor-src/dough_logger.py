@@ -0,0 +1,188 @@
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+# 結構化日誌模組
+# 每筆量測寫成一行 JSON (JSON Lines)，由背景執行緒批次寫入，
+# 主迴圈只需把記錄放進佇列，不會因為 SD 卡寫入緩慢而被阻塞。
+
+# 預設參數
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024   # 單一日誌檔上限 (位元組)
+DEFAULT_MAX_AGE_S = 24 * 60 * 60      # 單一日誌檔最長使用時間 (秒)
+DEFAULT_BACKUP_COUNT = 7              # 保留的壓縮舊檔數量
+DEFAULT_BATCH_SIZE = 64               # 每次寫入的最多記錄數
+DEFAULT_FLUSH_INTERVAL_S = 2.0        # 最長等待多久就寫入一次
+DEFAULT_MAX_BUFFER = 1000             # 記憶體中最多暫存的記錄數
+
+
+def _json_default(value):
+    """將 NumPy 數值等型別轉為 JSON 可序列化的型別"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class StructuredLogger:
+    """
+    以佇列和背景執行緒寫入 JSON Lines 日誌，支援依大小/時間輪替並壓縮舊檔。
+    儲存裝置卡住時，佇列滿了會丟棄最舊的記錄，記憶體用量不會無限成長。
+    """
+
+    def __init__(self, log_dir, base_name="dough_monitor",
+                 max_bytes=DEFAULT_MAX_BYTES, max_age_s=DEFAULT_MAX_AGE_S,
+                 backup_count=DEFAULT_BACKUP_COUNT, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval_s=DEFAULT_FLUSH_INTERVAL_S,
+                 max_buffer=DEFAULT_MAX_BUFFER, compress=True):
+        self.log_dir = log_dir
+        self.base_name = base_name
+        self.path = os.path.join(log_dir, f"{base_name}.jsonl")
+        # 記錄目前日誌檔的建立時間；程式每次執行後就結束，
+        # 不能以最後修改時間判斷檔案使用了多久
+        self.start_path = self.path + ".start"
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.compress = compress
+
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._drop_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._file = None
+        self._opened_at = None
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="dough-logger",
+                                        daemon=True)
+        self._thread.start()
+
+    def log(self, event, level="info", **fields):
+        """
+        放入一筆記錄 (不會阻塞)。
+        event: 事件名稱，例如 "measurement"。
+        level: "info"、"warning" 或 "error"。
+        fields: 其他欄位，會直接寫入 JSON。
+        """
+        record = {"ts": time.time(), "event": event, "level": level}
+        record.update(fields)
+        while True:
+            try:
+                self._queue.put_nowait(record)
+                return
+            except queue.Full:
+                # 佇列已滿 (儲存裝置跟不上)：丟棄最舊的記錄
+                with self._drop_lock:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def close(self, timeout=5.0):
+        """寫出剩餘記錄並停止背景執行緒。"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stop.is_set():
+                break
+        if self._file is not None:
+            self._file.close()
+
+    def _next_batch(self):
+        """收集一批記錄：湊滿 batch_size 或超過 flush_interval_s 就回傳。"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if self._stop.is_set() or timeout <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        with self._drop_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            batch.append({"ts": time.time(), "event": "log_dropped",
+                          "level": "warning", "count": dropped})
+
+        lines = (json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+                 for record in batch)
+        data = "".join(lines).encode("utf-8")
+        try:
+            self._rotate_if_needed(len(data))
+            self._file.write(data)
+            self._file.flush()
+        except OSError:
+            # 寫入失敗 (例如 SD 卡錯誤)：計入丟棄數，下一批再試
+            with self._drop_lock:
+                self.dropped += len(batch)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _rotate_if_needed(self, incoming):
+        if self._file is None:
+            self._open()
+        size = self._file.tell()
+        too_big = size + incoming > self.max_bytes and size > 0
+        too_old = time.time() - self._opened_at > self.max_age_s
+        if too_big or too_old:
+            self._file.close()
+            self._rotate()
+            self._open()
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        started_at = self._read_start_time() if self._file.tell() > 0 else None
+        if started_at is None:
+            # 新檔案 (或缺少建立時間記錄的舊檔)：從現在起算
+            started_at = time.time()
+            with open(self.start_path, "w") as f:
+                f.write(repr(started_at))
+        self._opened_at = started_at
+
+    def _read_start_time(self):
+        """讀取沿用中日誌檔的建立時間，找不到時回傳 None。"""
+        try:
+            with open(self.start_path) as f:
+                return float(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _rotate(self):
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        rotated = os.path.join(self.log_dir, f"{self.base_name}_{stamp}.jsonl")
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = os.path.join(self.log_dir,
+                                   f"{self.base_name}_{stamp}_{suffix:03d}.jsonl")
+            suffix += 1
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+        # 只保留最新的 backup_count 個舊檔 (依輪替時間排序，同一秒內再依檔名)
+        prefix = f"{self.base_name}_"
+        backups = [os.path.join(self.log_dir, name) for name in os.listdir(self.log_dir)
+                   if name.startswith(prefix) and ".jsonl" in name]
+        backups.sort(key=lambda path: (os.path.getmtime(path), path))
+        for path in backups[:-self.backup_count or None]:
+            os.remove(path)
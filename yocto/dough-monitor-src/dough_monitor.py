@@ -1,7 +1,12 @@
 import cv2
 import numpy as np
+import atexit
 import time
 import os
+import zipfile
+from collections import deque
+
+from dough_logger import StructuredLogger
 
 # --- 全局參數設定 (請根據您的實際校準結果修改) ---
 # 這個值非常重要，需要在實際硬體上校準！
@@ -12,11 +17,81 @@ PIXEL_TO_CM_RATIO = 0.0225
 # 這是二值化處理的下限值。OTSU 方法會自動找尋最佳閾值，但手動調整也可能有用。
 THRESHOLD_VALUE = 100
 
+# JPEG 解碼縮小倍數 (1、2、4 或 8)。大於 1 時在解碼階段直接縮小影像，
+# 可大幅減少批次重新校準時的解碼量；公分換算會自動依倍數調整。
+DECODE_SCALE = 1
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# 結構化日誌目錄 (由 run_monitor.sh 以環境變數指定)。
+# 未設定時訊息直接輸出到終端，方便手動執行時除錯。
+LOG_DIR = os.environ.get("DOUGH_MONITOR_LOG_DIR")
+LOGGER = None
+
+# 跨次執行保存狀態的目錄 (與日誌放在一起)。
+# run_monitor.sh 每次量測都啟動新的程序，追蹤器等狀態需存到檔案才能延續到下一次。
+STATE_DIR = LOG_DIR or "."
+
 # QEMU 模擬模式下使用的預載影像路徑
 SIMULATED_IMAGE_PATH = "/usr/bin/sample_dough_image.jpg"
 # 實際硬體模式下儲存擷取影像的路徑
 CAPTURE_OUTPUT_PATH = "dough_snapshot.jpg"
 
+# 多容器模式：一次標記影像中所有麵糰區域，而不只取最大的輪廓
+MULTI_REGION_MODE = False
+# 多容器模式下，小於此像素面積的區域視為噪點並忽略
+MIN_REGION_AREA_PX = 500
+# 追蹤容器時，質心在相鄰兩幀之間允許移動的最大像素距離
+MAX_TRACK_DISTANCE_PX = 80
+# 容器追蹤器的狀態檔 (位於 STATE_DIR)
+TRACKER_STATE_FILE = "region_tracker.npz"
+
+# 側視高度模式：攝影機從側面拍攝容器，逐欄量測麵糰頂面高度
+SIDE_VIEW_MODE = False
+# 容器深度 (公分)，用於由側面截面積估算體積
+CONTAINER_DEPTH_CM = 10.0
+# 回報的高度百分位數 (p98 可作為不受少數突起欄位影響的高度)
+HEIGHT_PERCENTILES = (50, 90, 98)
+# 高度剖面平滑所使用的滾動視窗幀數
+PROFILE_WINDOW_FRAMES = 10
+# 高度剖面滾動視窗的狀態檔 (位於 STATE_DIR)
+PROFILE_WINDOW_STATE_FILE = "height_profile_window.npz"
+
+# 訊息輸出函數
+def report(event, message, level="info", **fields):
+    """
+    輸出一筆訊息。
+    啟用結構化日誌時寫入一筆 JSON 記錄 (不會阻塞)，否則直接印出 message。
+    event: 事件名稱，例如 "measurement"。
+    fields: 寫入記錄的其他欄位 (例如量測數值)。
+    """
+    if LOGGER is not None:
+        LOGGER.log(event, level=level, message=message, **fields)
+    else:
+        print(message)
+
+# 狀態檔存取函數
+def save_state(path, **arrays):
+    """
+    將多個陣列存成一個 .npz 狀態檔。
+    先寫入暫存檔再改名，寫到一半斷電也不會留下損壞的狀態檔。
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+def load_state(path):
+    """讀取 .npz 狀態檔並回傳 {名稱: 陣列}；檔案不存在或已損壞時回傳 None。"""
+    try:
+        with np.load(path) as data:
+            return {key: data[key] for key in data.files}
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+
 # 影像擷取函數
 def capture_image(camera_index=0, output_path="dough_snapshot.jpg"):
     """
@@ -25,11 +100,12 @@ def capture_image(camera_index=0, output_path="dough_snapshot.jpg"):
                   在 Raspberry Pi 上，通常為 0。
     output_path: 儲存影像的路徑。
     """
-    print(f"嘗試從攝影機 {camera_index} 擷取影像...")
+    report("capture", f"嘗試從攝影機 {camera_index} 擷取影像...", camera_index=camera_index)
     cap = cv2.VideoCapture(camera_index)
 
     if not cap.isOpened():
-        print(f"錯誤：無法開啟攝影機 {camera_index}。請確認攝影機連接和權限。")
+        report("capture", f"錯誤：無法開啟攝影機 {camera_index}。請確認攝影機連接和權限。",
+               level="error", camera_index=camera_index)
         cap.release()
         return False
 
@@ -42,33 +118,40 @@ def capture_image(camera_index=0, output_path="dough_snapshot.jpg"):
     for _ in range(5):
         ret, frame = cap.read()
         if not ret:
-            print("警告：初始化讀取幀失敗。")
+            report("capture", "警告：初始化讀取幀失敗。", level="warning")
             break
 
     ret, frame = cap.read() # 讀取最終幀
 
     if ret:
         cv2.imwrite(output_path, frame)
-        print(f"影像已儲存至：{output_path}")
+        report("capture", f"影像已儲存至：{output_path}", output_path=output_path)
     else:
-        print("錯誤：無法讀取影像幀。")
+        report("capture", "錯誤：無法讀取影像幀。", level="error")
 
     cap.release() # 釋放攝影機資源
     return ret
 
-# 麵糰尺寸測量函數
-def measure_dough_size(image_path, pixel_to_cm_ratio=PIXEL_TO_CM_RATIO):
+# 影像載入函數
+def load_image(image_path, decode_scale=DECODE_SCALE):
     """
-    從影像中測量麵糰的大小（面積）。
-    image_path: 麵糰影像的路徑。
-    pixel_to_cm_ratio: 像素到公分的轉換比例 (需要預先校準)。
-                       例如，如果 100 像素代表 1 公分，則比例為 0.01。
+    載入影像，decode_scale 大於 1 時使用 OpenCV 的縮小解碼模式。
+    image_path: 影像路徑。
+    decode_scale: 解碼縮小倍數 (1、2、4 或 8)。
     """
-    img = cv2.imread(image_path)
-    if img is None:
-        print(f"錯誤：無法載入影像 {image_path}。請確認檔案是否存在。")
-        return None, None, None
+    if decode_scale == 1:
+        return cv2.imread(image_path)
+    if decode_scale not in REDUCED_DECODE_FLAGS:
+        raise ValueError(f"不支援的解碼縮小倍數：{decode_scale}")
+    return cv2.imread(image_path, REDUCED_DECODE_FLAGS[decode_scale])
 
+# 麵糰分割函數
+def segment_dough(img):
+    """
+    將影像二值化，分離出麵糰區域。
+    img: BGR 影像。
+    回傳二值遮罩：麵糰區域為白色 (255)，背景為黑色 (0)。
+    """
     # 1. 灰度轉換
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
@@ -88,22 +171,44 @@ def measure_dough_size(image_path, pixel_to_cm_ratio=PIXEL_TO_CM_RATIO):
     thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=1)
     thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel, iterations=1)
 
+    return thresh
+
+# 麵糰尺寸測量函數
+def measure_dough_size(image_path, pixel_to_cm_ratio=PIXEL_TO_CM_RATIO,
+                       decode_scale=DECODE_SCALE):
+    """
+    從影像中測量麵糰的大小（面積）。
+    image_path: 麵糰影像的路徑。
+    pixel_to_cm_ratio: 像素到公分的轉換比例 (需要預先校準)。
+                       例如，如果 100 像素代表 1 公分，則比例為 0.01。
+    decode_scale: 解碼縮小倍數；記錄的像素值皆換算回原始解析度。
+    """
+    img = load_image(image_path, decode_scale)
+    if img is None:
+        report("measurement", f"錯誤：無法載入影像 {image_path}。請確認檔案是否存在。",
+               level="error", image_path=image_path)
+        return None, None, None
+
+    # 1-4. 灰度轉換、模糊、閾值處理與形態學操作
+    thresh = segment_dough(img)
+
     # 5. 輪廓檢測 (RETR_EXTERNAL 只會檢測外層輪廓)
     contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
     if not contours:
-        print("未檢測到任何輪廓。請檢查閾值或影像質量。")
+        report("measurement", "未檢測到任何輪廓。請檢查閾值或影像質量。",
+               level="warning", image_path=image_path)
         return None, None, None
 
     # 6. 找到最大的輪廓（通常是麵糰）
     max_contour = max(contours, key=cv2.contourArea)
 
-    # 7. 計算輪廓面積 (像素單位)
-    pixel_area = cv2.contourArea(max_contour)
+    # 7. 計算輪廓面積 (像素單位，縮小後每個像素的邊長相當於 decode_scale 個原始像素)
+    pixel_area = cv2.contourArea(max_contour) * decode_scale ** 2
 
     # 8. 計算包圍盒 (Bounding Box) 用於估計高度
     x, y, w, h = cv2.boundingRect(max_contour)
-    pixel_height = h # 麵糰在影像中的像素高度
+    pixel_height = h * decode_scale # 麵糰在原始影像中的像素高度
 
     # 9. 將像素面積和高度轉換為實際面積和高度
     actual_area_cm2 = pixel_area * (pixel_to_cm_ratio ** 2)
@@ -123,42 +228,364 @@ def measure_dough_size(image_path, pixel_to_cm_ratio=PIXEL_TO_CM_RATIO):
     # 而不是直接顯示 (因為 QEMU 環境可能沒有 X11 顯示)
     debug_output_path = "dough_detection_debug.jpg"
     cv2.imwrite(debug_output_path, output_img)
-    print(f"偵測結果影像已儲存至：{debug_output_path}")
 
-    print(f"麵糰像素面積：{pixel_area:.2f} 像素")
-    print(f"麵糰實際面積：{actual_area_cm2:.2f} cm^2")
-    print(f"麵糰像素高度：{pixel_height:.2f} 像素")
-    print(f"麵糰實際高度：{actual_height_cm:.2f} cm")
+    # 每次量測只輸出一筆記錄
+    report("measurement",
+           f"偵測結果影像已儲存至：{debug_output_path}\n"
+           f"麵糰像素面積：{pixel_area:.2f} 像素\n"
+           f"麵糰實際面積：{actual_area_cm2:.2f} cm^2\n"
+           f"麵糰像素高度：{pixel_height:.2f} 像素\n"
+           f"麵糰實際高度：{actual_height_cm:.2f} cm",
+           mode="size", image_path=image_path, pixel_area=pixel_area,
+           area_cm2=actual_area_cm2, pixel_height=pixel_height,
+           height_cm=actual_height_cm, debug_image_path=debug_output_path)
 
     return actual_area_cm2, actual_height_cm, debug_output_path
 
+# 多區域麵糰測量函數
+def measure_dough_regions(image_path, pixel_to_cm_ratio=PIXEL_TO_CM_RATIO,
+                          min_area_px=MIN_REGION_AREA_PX, tracker=None,
+                          decode_scale=DECODE_SCALE):
+    """
+    一次標記影像中所有麵糰區域 (適用於發酵箱內放置多個容器的情況)。
+    image_path: 麵糰影像的路徑。
+    pixel_to_cm_ratio: 像素到公分的轉換比例 (需要預先校準)。
+    min_area_px: 小於此像素面積的區域會被忽略。
+    tracker: 可選的 RegionTracker，用來在連續幀之間維持容器編號。
+    decode_scale: 解碼縮小倍數；min_area_px 與回傳的像素值皆以原始解析度計算。
+    回傳字典，每個欄位都是長度為 N 的 NumPy 陣列 (N 為區域數量)；
+    載入失敗時回傳 None。
+    """
+    img = load_image(image_path, decode_scale)
+    if img is None:
+        report("measurement", f"錯誤：無法載入影像 {image_path}。請確認檔案是否存在。",
+               level="error", image_path=image_path)
+        return None
+
+    thresh = segment_dough(img)
+
+    # 連通區域標記：一次取得所有區域的面積、包圍盒與質心，不需逐一走訪輪廓
+    # stats 每列為 [x, y, w, h, area]，第 0 列為背景
+    _, labels, stats, centroids = cv2.connectedComponentsWithStats(
+        thresh, connectivity=8)
+    stats = stats[1:]
+    centroids = centroids[1:]
+
+    keep = stats[:, cv2.CC_STAT_AREA] * decode_scale ** 2 >= min_area_px
+    label_ids = np.flatnonzero(keep) + 1
+    stats = stats[keep]
+    centroids = centroids[keep]
+
+    # 換算回原始解析度的像素單位
+    pixel_areas = stats[:, cv2.CC_STAT_AREA].astype(np.float64) * decode_scale ** 2
+    bboxes = stats[:, :4] * decode_scale
+    pixel_heights = stats[:, cv2.CC_STAT_HEIGHT].astype(np.float64) * decode_scale
+
+    if tracker is not None:
+        region_ids = tracker.update(centroids * decode_scale)
+    else:
+        region_ids = np.arange(len(label_ids))
+
+    # 可視化：以遮罩運算一次描出所有保留區域的邊界
+    output_img = img.copy()
+    lut = np.zeros(len(keep) + 1, np.uint8)
+    lut[label_ids] = 255
+    kept_mask = lut[labels]
+    outline = cv2.morphologyEx(kept_mask, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    output_img[outline > 0] = (0, 255, 0)
+    for region_id, (cx, cy) in zip(region_ids, centroids):
+        cv2.putText(output_img, f"#{region_id}", (int(cx), int(cy)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+
+    debug_output_path = "dough_detection_debug.jpg"
+    cv2.imwrite(debug_output_path, output_img)
+
+    regions = {
+        'ids': region_ids,
+        'pixel_areas': pixel_areas,
+        'areas_cm2': pixel_areas * (pixel_to_cm_ratio ** 2),
+        'bboxes': bboxes,
+        'centroids': centroids * decode_scale,
+        'heights_cm': pixel_heights * pixel_to_cm_ratio,
+        'debug_image_path': debug_output_path,
+    }
+    report("measurement",
+           f"偵測結果影像已儲存至：{debug_output_path}\n"
+           f"偵測到 {len(label_ids)} 個麵糰區域。",
+           mode="regions", image_path=image_path, **regions)
+    return regions
+
+# 側視高度剖面函數
+def extract_height_profile(mask):
+    """
+    從二值遮罩逐欄取得麵糰高度剖面 (像素)。
+    mask: 二值遮罩，麵糰區域為非零值。
+    只保留最大的連通區域 (麵糰本體)，與其分離的雜點或碎屑不計入高度；
+    每一欄的高度為該欄最上方與最下方麵糰像素之間的距離 (內部孔洞視為麵糰)，
+    沒有麵糰的欄位高度為 0。
+    """
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(
+        (mask > 0).astype(np.uint8), connectivity=8)
+    if count <= 1:
+        return np.zeros(mask.shape[1], dtype=np.float64)
+    largest = 1 + np.argmax(stats[1:, cv2.CC_STAT_AREA])
+    fg = labels == largest
+    has_dough = fg.any(axis=0)
+    # argmax 回傳每欄第一個 True 的列索引，即頂面位置
+    top = fg.argmax(axis=0)
+    bottom = fg.shape[0] - 1 - fg[::-1].argmax(axis=0)
+    return np.where(has_dough, bottom - top + 1, 0).astype(np.float64)
+
+def summarize_height_profile(profile_px, pixel_to_cm_ratio=PIXEL_TO_CM_RATIO,
+                             percentiles=HEIGHT_PERCENTILES,
+                             depth_cm=CONTAINER_DEPTH_CM):
+    """
+    計算高度剖面的統計值。
+    profile_px: 每欄的高度 (像素)。
+    回傳平均、最大、百分位數高度 (公分)，以及估算體積 (立方公分)。
+    """
+    profile_cm = profile_px * pixel_to_cm_ratio
+    occupied = profile_cm[profile_px > 0]
+    if occupied.size == 0:
+        return None
+
+    # 截面積 = 各欄高度 x 欄寬，體積假設容器深度固定
+    cross_section_cm2 = profile_cm.sum() * pixel_to_cm_ratio
+    summary = {
+        'mean_height_cm': float(occupied.mean()),
+        'max_height_cm': float(occupied.max()),
+        'width_cm': occupied.size * pixel_to_cm_ratio,
+        'cross_section_cm2': float(cross_section_cm2),
+        'volume_cm3': float(cross_section_cm2 * depth_cm),
+    }
+    for p, value in zip(percentiles, np.percentile(occupied, percentiles)):
+        summary[f'p{p}_height_cm'] = float(value)
+    return summary
+
+def measure_dough_height_profile(image_path, pixel_to_cm_ratio=PIXEL_TO_CM_RATIO,
+                                 window=None, decode_scale=DECODE_SCALE):
+    """
+    側視模式：從影像中量測麵糰的頂面高度剖面。
+    image_path: 麵糰側視影像的路徑。
+    pixel_to_cm_ratio: 像素到公分的轉換比例 (需要預先校準)。
+    window: 可選的 HeightProfileWindow，用來在連續幀之間平滑剖面。
+    decode_scale: 解碼縮小倍數，剖面以縮小後的欄位計算。
+    回傳高度統計字典；載入失敗或未檢測到麵糰時回傳 None。
+    """
+    img = load_image(image_path, decode_scale)
+    if img is None:
+        report("measurement", f"錯誤：無法載入影像 {image_path}。請確認檔案是否存在。",
+               level="error", image_path=image_path)
+        return None
+
+    profile = extract_height_profile(segment_dough(img))
+    if window is not None:
+        profile = window.update(profile)
+
+    summary = summarize_height_profile(profile, pixel_to_cm_ratio * decode_scale)
+    if summary is None:
+        report("measurement", "未檢測到任何麵糰。請檢查閾值或影像質量。",
+               level="warning", image_path=image_path)
+        return None
+
+    report("measurement",
+           f"麵糰平均高度：{summary['mean_height_cm']:.2f} cm\n"
+           f"麵糰最大高度：{summary['max_height_cm']:.2f} cm\n"
+           f"麵糰估算體積：{summary['volume_cm3']:.2f} cm^3",
+           mode="profile", image_path=image_path, **summary)
+    return summary
+
+# 高度剖面滾動視窗
+class HeightProfileWindow:
+    """
+    對最近 size 幀的高度剖面做滾動平均。
+    以累加和增量更新：加入新剖面、扣除被擠出的舊剖面，不需重新計算整個視窗。
+    """
+
+    def __init__(self, size=PROFILE_WINDOW_FRAMES):
+        self.size = size
+        self.profiles = deque()
+        self.total = None
+
+    def update(self, profile):
+        """加入一幀剖面並回傳目前視窗內的平均剖面。"""
+        if self.total is None or self.total.shape != profile.shape:
+            # 解析度改變時重新開始累計
+            self.profiles.clear()
+            self.total = np.zeros_like(profile, dtype=np.float64)
+
+        self.profiles.append(profile)
+        self.total += profile
+        if len(self.profiles) > self.size:
+            self.total -= self.profiles.popleft()
+
+        return self.total / len(self.profiles)
+
+    def save(self, path):
+        """將視窗內的剖面存到檔案，供下一次執行延續。"""
+        if self.profiles:
+            save_state(path, profiles=np.stack(self.profiles))
+
+    @classmethod
+    def load(cls, path, size=PROFILE_WINDOW_FRAMES):
+        """從檔案還原視窗 (累加和由剖面重新計算)；檔案不存在或已損壞時回傳空視窗。"""
+        window = cls(size)
+        state = load_state(path)
+        profiles = state.get("profiles") if state is not None else None
+        if profiles is None or profiles.ndim != 2 or len(profiles) == 0:
+            return window
+        # 視窗大小調小時只保留最新的幾幀
+        profiles = profiles[-size:].astype(np.float64)
+        window.profiles.extend(profiles)
+        window.total = profiles.sum(axis=0)
+        return window
+
+# 容器追蹤器
+class RegionTracker:
+    """
+    以質心最近距離在連續幀之間維持每個容器的編號。
+    max_distance: 質心在相鄰兩幀之間允許移動的最大像素距離。
+    max_missed: 容器連續消失超過此幀數後即移除其編號。
+    """
+
+    def __init__(self, max_distance=MAX_TRACK_DISTANCE_PX, max_missed=5):
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.next_id = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.centroids = np.empty((0, 2), dtype=np.float64)
+        self.missed = np.empty(0, dtype=np.int64)
+
+    def update(self, centroids):
+        """
+        將本幀的質心指派給既有編號，回傳與 centroids 對應的編號陣列。
+        centroids: 形狀為 (N, 2) 的質心陣列。
+        """
+        centroids = np.asarray(centroids, dtype=np.float64).reshape(-1, 2)
+        assigned = np.full(len(centroids), -1, dtype=np.int64)
+        matched_tracks = np.zeros(len(self.ids), dtype=bool)
+
+        if len(self.ids) and len(centroids):
+            # 距離矩陣 (既有軌跡 x 本幀區域)，依距離由小到大貪婪配對
+            diff = self.centroids[:, None, :] - centroids[None, :, :]
+            dist = np.linalg.norm(diff, axis=2)
+            order = np.argsort(dist, axis=None)
+            rows, cols = np.unravel_index(order, dist.shape)
+            within = dist[rows, cols] <= self.max_distance
+            for r, c in zip(rows[within], cols[within]):
+                if matched_tracks[r] or assigned[c] >= 0:
+                    continue
+                matched_tracks[r] = True
+                assigned[c] = self.ids[r]
+                self.centroids[r] = centroids[c]
+
+        # 未配對到的既有軌跡累計消失次數，超過上限即移除
+        self.missed = np.where(matched_tracks, 0, self.missed + 1)
+        alive = self.missed <= self.max_missed
+        self.ids = self.ids[alive]
+        self.centroids = self.centroids[alive]
+        self.missed = self.missed[alive]
+
+        # 未配對到的新區域給予新編號
+        new = assigned < 0
+        new_ids = np.arange(self.next_id, self.next_id + new.sum())
+        self.next_id += len(new_ids)
+        assigned[new] = new_ids
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.centroids = np.concatenate([self.centroids, centroids[new]])
+        self.missed = np.concatenate(
+            [self.missed, np.zeros(len(new_ids), dtype=np.int64)])
+
+        return assigned
+
+    def save(self, path):
+        """將追蹤狀態存到檔案，供下一次執行延續編號。"""
+        save_state(path, ids=self.ids, centroids=self.centroids,
+                   missed=self.missed, next_id=np.int64(self.next_id))
+
+    @classmethod
+    def load(cls, path, max_distance=MAX_TRACK_DISTANCE_PX, max_missed=5):
+        """從檔案還原追蹤器；檔案不存在或內容不完整時回傳新的追蹤器。"""
+        tracker = cls(max_distance, max_missed)
+        state = load_state(path)
+        try:
+            ids = state["ids"].astype(np.int64)
+            centroids = state["centroids"].astype(np.float64).reshape(-1, 2)
+            missed = state["missed"].astype(np.int64)
+            next_id = int(state["next_id"])
+        except (TypeError, KeyError, ValueError):
+            return tracker
+        if not len(ids) == len(centroids) == len(missed):
+            return tracker
+        tracker.ids, tracker.centroids, tracker.missed = ids, centroids, missed
+        tracker.next_id = next_id
+        return tracker
+
 # --- 主程式運行邏輯 ---
 if __name__ == "__main__":
+    # 由 run_monitor.sh 啟動時寫入結構化日誌；程式結束 (包含 exit()) 時會寫出剩餘記錄
+    if LOG_DIR:
+        LOGGER = StructuredLogger(LOG_DIR)
+        atexit.register(LOGGER.close)
+
     # 判斷當前運行環境：QEMU 模擬模式還是實際硬體模式
     # 我們假設在 QEMU 模擬環境中，會將 sample_dough_image.jpg 檔案安裝到 /usr/bin/
     # 實際硬體上則不會有這個檔案。
     is_qemu_simulation = os.path.exists(SIMULATED_IMAGE_PATH)
 
     if is_qemu_simulation:
-        print("偵測到在 QEMU 模擬模式下運行。將使用預載影像進行分析。")
+        report("startup", "偵測到在 QEMU 模擬模式下運行。將使用預載影像進行分析。", mode="qemu")
         image_to_process = SIMULATED_IMAGE_PATH
         # 在 QEMU 中，你無法直接擷取影像，所以跳過 capture_image
     else:
-        print("偵測到在實際硬體模式下運行。將嘗試擷取攝影機影像。")
+        report("startup", "偵測到在實際硬體模式下運行。將嘗試擷取攝影機影像。", mode="hardware")
         # 嘗試從攝影機擷取影像
         if capture_image(camera_index=0, output_path=CAPTURE_OUTPUT_PATH):
             image_to_process = CAPTURE_OUTPUT_PATH
         else:
-            print("影像擷取失敗，無法進行麵糰尺寸分析。")
+            report("result", "影像擷取失敗，無法進行麵糰尺寸分析。", level="error")
             exit() # 結束程式
 
+    if SIDE_VIEW_MODE:
+        # 側視模式：量測頂面高度剖面，並以上一次執行留下的視窗平滑
+        window_path = os.path.join(STATE_DIR, PROFILE_WINDOW_STATE_FILE)
+        window = HeightProfileWindow.load(window_path)
+        profile_summary = measure_dough_height_profile(
+            image_to_process, PIXEL_TO_CM_RATIO, window=window)
+        window.save(window_path)
+        if profile_summary is None:
+            report("result", "麵糰高度剖面測量失敗。", level="error")
+            exit()
+        report("result", "\n--- 最終測量結果 ---\n" + "\n".join(
+            f"{key}：{value:.2f}" for key, value in profile_summary.items()))
+        exit()
+
+    if MULTI_REGION_MODE:
+        # 多容器模式：標記並測量所有麵糰區域，並沿用上一次執行的容器編號
+        tracker_path = os.path.join(STATE_DIR, TRACKER_STATE_FILE)
+        tracker = RegionTracker.load(tracker_path)
+        regions = measure_dough_regions(image_to_process, PIXEL_TO_CM_RATIO,
+                                        tracker=tracker)
+        if regions is not None:
+            tracker.save(tracker_path)
+        if regions is None or len(regions['ids']) == 0:
+            report("result", "麵糰尺寸測量失敗。", level="error")
+            exit()
+        report("result", "\n--- 最終測量結果 ---\n" + "\n".join(
+            f"容器 #{region_id}：面積 {area:.2f} cm^2，高度 {height:.2f} cm"
+            for region_id, area, height
+            in zip(regions['ids'], regions['areas_cm2'], regions['heights_cm']))
+            + f"\n偵測結果圖已儲存為：{regions['debug_image_path']}")
+        exit()
+
     # 進行麵糰尺寸測量
     area, height, debug_img_path = measure_dough_size(image_to_process, PIXEL_TO_CM_RATIO)
 
     if area is not None and height is not None:
-        print(f"\n--- 最終測量結果 ---")
-        print(f"麵糰面積：{area:.2f} cm^2")
-        print(f"麵糰高度：{height:.2f} cm")
-        print(f"偵測結果圖已儲存為：{debug_img_path}")
+        report("result",
+               f"\n--- 最終測量結果 ---\n"
+               f"麵糰面積：{area:.2f} cm^2\n"
+               f"麵糰高度：{height:.2f} cm\n"
+               f"偵測結果圖已儲存為：{debug_img_path}")
     else:
-        print("麵糰尺寸測量失敗。")
+        report("result", "麵糰尺寸測量失敗。", level="error")